@@ -8,7 +8,10 @@ from pathlib import Path
 
 # import the robust loader and model from your loader module
 # make sure edm_data_loader.py is in the same folder or in PYTHONPATH
-from edm_data_loader import load_edm_dataset, EDMModel
+from edm_data_loader import (
+    load_edm_dataset, apply_edm_model, calibrate_edm_beta, project_edm_dataset,
+    edm_time_to_threshold_surface, edm_dataset_version, EDMModel
+)
 
 # ---------------------------
 # Custom CSS
@@ -178,6 +181,11 @@ Welcome to the Humanoid Work Math Project — explore how automation shapes empl
 st.divider()
 """, unsafe_allow_html=True)
 
+# Cached derived surfaces (keyed by dataset version, the data itself is not hashed)
+@st.cache_data(show_spinner=False)
+def cached_threshold_surface(version, _data, thresholds, A_values):
+    return edm_time_to_threshold_surface(_data, list(thresholds), list(A_values))
+
 # Sidebar Controls
 st.sidebar.header("🧭 Navigation")
 mode = st.sidebar.radio("Select Mode:", ["Manual Simulation", "ILOSTAT Dataset"])
@@ -298,6 +306,17 @@ elif mode == "ILOSTAT Dataset":
     if data.empty:
         st.error("⚠️ Could not load EDM dataset. Please check your data files.")
     else:
+        # β: fixed default or fitted per country from the employment series (no reload needed)
+        beta_mode = st.sidebar.radio("Sensitivity (β):", ["Fixed (β = 0.30)", "Calibrated per country"])
+        if beta_mode == "Calibrated per country":
+            calibration = calibrate_edm_beta(data)
+            data = apply_edm_model(data.copy(), EDMModel(beta=0.3), beta=calibration["beta"][calibration["calibrated"]])
+            st.info(f"β calibrated for {int(calibration['calibrated'].sum())} of {len(calibration)} countries (others keep β = 0.30). Median R² = {calibration.loc[calibration['calibrated'], 'r2'].median():.2f}")
+            if calibration["clipped"].any():
+                st.warning(f"{int(calibration['clipped'].sum())} countries have a fitted β outside the allowed range (e.g. declining employment) and keep β = 0.30.", icon="⚠️")
+            with st.expander("📐 Per-country β calibration (log-linear fit)"):
+                st.dataframe(calibration.sort_values("r2", ascending=False), use_container_width=True)
+
         # latest per country (safely handle Year missing)
         if "Year" in data.columns:
             latest = data.sort_values("Year").drop_duplicates("Area", keep="last")
@@ -417,10 +436,86 @@ elif mode == "ILOSTAT Dataset":
         st.plotly_chart(fig_scatter, use_container_width=True)
         st.divider()
 
+        # Displacement trajectories over horizons × β scenarios (one projection tensor)
+        st.markdown('<div class="section-header"><h2>📉 Displacement Trajectories – Horizons & Scenarios</h2></div>', unsafe_allow_html=True)
+        proj_col1, proj_col2 = st.columns(2)
+        with proj_col1:
+            max_horizon = st.slider("Projection Horizon (years)", 5, 30, 30, step=1)
+        with proj_col2:
+            beta_grid = st.multiselect("Sensitivity Scenarios (β)", [0.1, 0.2, 0.3, 0.5, 0.75, 1.0], default=[0.1, 0.3, 0.5])
+
+        projection = project_edm_dataset(data, np.arange(0, max_horizon + 1), beta_scenarios=beta_grid or [0.3])
+        proj_countries = projection.coords["country"].tolist()
+        default_countries = [c for c in latest.sort_values(by="EDM_index", ascending=False)["Area"] if c in set(proj_countries)][:5]
+        selected_countries = st.multiselect("Countries", proj_countries, default=default_countries)
+
+        if selected_countries:
+            traj = projection.sel(country=selected_countries).to_frame(metric="percent")
+            traj["Scenario"] = traj["beta"].map(lambda b: f"β = {b:.2f}")
+            fig_traj = px.line(
+                traj,
+                x="horizon",
+                y="D_pct",
+                color="country",
+                line_dash="Scenario",
+                labels={"horizon": "Horizon (years)", "D_pct": "Displacement Increase (D(t)-D₀)/D₀", "country": "Country"},
+                title="Projected Displacement Increase by Horizon"
+            )
+            fig_traj.update_yaxes(tickformat=".0%")
+            fig_traj.update_layout(
+                plot_bgcolor="rgba(15,20,25,0.8)",
+                paper_bgcolor="rgba(26,31,46,0.9)",
+                font=dict(color="#e0e0e0"),
+                height=450
+            )
+            st.plotly_chart(fig_traj, use_container_width=True)
+
+        st.download_button(
+            "⬇️ Download full projection (countries × horizons × scenarios, CSV)",
+            projection.to_frame().to_csv(index=False),
+            file_name="edm_projection.csv",
+            mime="text/csv"
+        )
+        st.divider()
+
+        # Time to displacement threshold (country × threshold × A surface, cached per dataset version)
+        st.markdown('<div class="section-header"><h2>⏱️ Time to Displacement Threshold</h2></div>', unsafe_allow_html=True)
+        thresholds = [0.1, 0.25, 0.5, 1.0]
+        A_grid = [0.25, 0.5, 0.75, 1.0]
+        surface = cached_threshold_surface(edm_dataset_version(data), data, tuple(thresholds), tuple(A_grid))
+
+        ttt_col1, ttt_col2 = st.columns(2)
+        with ttt_col1:
+            threshold = st.selectbox("Displacement Threshold", thresholds, index=thresholds.index(0.5), format_func=lambda v: f"{v:.0%}")
+        with ttt_col2:
+            A_choice = st.selectbox("Automation Speed (A)", ["own"] + A_grid, format_func=lambda v: "Country's own A" if v == "own" else f"A = {v:.2f}")
+
+        ranking = surface[(threshold, A_choice)].dropna().sort_values().head(15)
+        fig_ttt = go.Figure(go.Bar(
+            x=ranking.values,
+            y=ranking.index,
+            orientation="h",
+            marker=dict(color=ranking.values, colorscale="Reds_r", line=dict(width=1, color="#ffffff")),
+            text=[f"{v:.1f} yrs" for v in ranking.values],
+            textposition="outside",
+            hovertemplate="<b>%{y}</b><br>Years to threshold: %{x:.1f}<extra></extra>"
+        ))
+        fig_ttt.update_layout(
+            title=f"Fastest to {threshold:.0%} Displacement Increase",
+            height=450,
+            yaxis=dict(autorange="reversed", tickfont=dict(color="#e0e0e0")),
+            xaxis=dict(title="Years", tickfont=dict(color="#e0e0e0")),
+            plot_bgcolor="rgba(15,20,25,0.8)",
+            paper_bgcolor="rgba(26,31,46,0.9)",
+            font=dict(color="#e0e0e0")
+        )
+        st.plotly_chart(fig_ttt, use_container_width=True)
+        st.divider()
+
         # Full table
         st.markdown('<div class="section-header"><h2>🧾 Full EDM Data Table</h2></div>', unsafe_allow_html=True)
         st.dataframe(
-            latest[["Area", "Year", "A", "Employment", "Population", "EmpPop", "Unemp", "TimeYears", "EDM_raw", "EDM_pct", "EDM_index"]].sort_values(by="EDM_index", ascending=False),
+            latest[["Area", "Year", "A", "Employment", "Population", "EmpPop", "Unemp", "TimeYears", "Beta", "EDM_raw", "EDM_pct", "EDM_index"]].sort_values(by="EDM_index", ascending=False),
             use_container_width=True,
             height=450
         )
@@ -1,5 +1,6 @@
 # edm_data_loader.py
 import os
+import hashlib
 import pandas as pd
 import numpy as np
 import streamlit as st
@@ -24,6 +25,369 @@ def _find_file_by_tokens(tokens, files_in_dir):
             return fname
     return None
 
+def _extract_area_year_value(df, value_names=("total", "value", "observed_value", "obs_value")):
+    """
+    Infer Area / Year / value columns of an ILOSTAT-style table.
+    Returns a frame with columns ["Area", "Year", "Total"], or None if the columns can't be inferred.
+    """
+    # find area column
+    area_col = next((c for c in df.columns if c.lower() in ("area", "country", "country or area", "location", "geo")), None)
+    # find year column
+    year_col = next((c for c in df.columns if "year" in c.lower() or c.lower() in ("time", "period")), None)
+    # find total/value column: prefer "total" or a numeric column
+    total_col = next((c for c in df.columns if c.lower() in value_names), None)
+    if total_col is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        # prefer columns that are not year if possible
+        if year_col and year_col in numeric_cols and len(numeric_cols) > 1:
+            numeric_cols = [c for c in numeric_cols if c != year_col]
+        total_col = numeric_cols[0] if numeric_cols else None
+
+    # fallback inference if necessary
+    if area_col is None:
+        str_cols = df.select_dtypes(include=['object']).columns.tolist()
+        area_col = str_cols[0] if str_cols else None
+    if year_col is None:
+        # try find integer-like column
+        cand = next((c for c in df.columns if df[c].dropna().apply(lambda v: isinstance(v, (int, np.integer))).all()), None)
+        year_col = cand
+    if not (area_col and year_col and total_col):
+        return None
+
+    small = df[[area_col, year_col, total_col]].copy()
+    small.columns = ["Area", "Year", "Total"]
+    small["Area"] = small["Area"].astype(str).str.strip()
+    # coerce Year to int where possible
+    try:
+        small["Year"] = small["Year"].astype(int)
+    except Exception:
+        small["Year"] = pd.to_numeric(small["Year"], errors="coerce").astype('Int64')
+    small["Total"] = pd.to_numeric(small["Total"], errors="coerce")
+    # UN World Population Prospects publishes PopTotal in thousands
+    if str(total_col).lower() == "poptotal":
+        small["Total"] = small["Total"] * 1000.0
+    small.dropna(subset=["Area", "Year"], inplace=True)
+    return small
+
+# Single recent population estimate per country.
+# Only used for countries missing from the population-by-year table (or when no table is present).
+POPULATION_PROXY = {
+    "India": 1417173000,
+    "China": 1425887337,
+    "United States": 338289857,
+    "Indonesia": 277534122,
+    "Pakistan": 240485658,
+    "Brazil": 215313498,
+    "Nigeria": 223804632,
+    "Bangladesh": 171186372,
+    "Russia": 144444359,
+    "Mexico": 128932753,
+    "Japan": 123294513,
+    "Ethiopia": 130000000,
+    "Philippines": 120595548,
+    "Egypt": 110000000,
+    "Germany": 84405100,
+    "Vietnam": 98186856,
+    "DR Congo": 99010000,
+    "Turkey": 86749700,
+    "Iran": 91567416,
+    "Thailand": 71801915,
+    "United Kingdom": 67736802,
+    "Tanzania": 65497748,
+    "France": 68017000,
+    "South Africa": 60142978,
+    "Kenya": 54054487,
+    "Myanmar": 54732500,
+    "Sudan": 47753632,
+    "Uganda": 48582220,
+    "Angola": 36815961,
+    "Algeria": 44945000,
+    "Iraq": 43533592,
+    "Canada": 39742154,
+    "Afghanistan": 42972958,
+    "Ukraine": 38000000,
+    "Saudi Arabia": 36408820,
+    "Morocco": 38081755,
+    "Uzbekistan": 35896996,
+    "Malaysia": 34305500,
+    "Yemen": 34449825,
+    "Peru": 34352719,
+    "Australia": 26603400,
+    "Colombia": 52085168,
+    "Sri Lanka": 22156000,
+    "Syria": 22125490,
+    "Poland": 37654000,
+    "Romania": 18970458,
+    "Chile": 19600000,
+    "Kazakhstan": 20331129,
+    "Tajikistan": 10143200,
+    "Netherlands": 17750000,
+    "South Korea": 51908400,
+    "Greece": 10640801,
+    "Portugal": 10426199,
+    "Austria": 9108202,
+    "Hungary": 9673107,
+    "Sweden": 10549347,
+    "Azerbaijan": 10139177,
+    "Belgium": 11690814,
+    "Tunisia": 12356117,
+    "Cuba": 10500981,
+    "Czech Republic": 10510785,
+    "Israel": 9656842,
+    "Switzerland": 8776000,
+    "Bulgaria": 6840000,
+    "Serbia": 6690121,
+    "Hong Kong": 7685600,
+    "Denmark": 5903037,
+    "Singapore": 5917600,
+    "Slovakia": 5460721,
+    "Finland": 5571665,
+    "Norway": 5547933,
+    "Ireland": 5127900,
+    "New Zealand": 5228100,
+    "Costa Rica": 5180829,
+    "Lebanon": 5489094,
+    "Panama": 4408581,
+    "Iceland": 397413,
+    "Luxembourg": 683201,
+}
+
+def _proxy_population(area):
+    """Static population estimate for a country name (exact, then partial match)."""
+    # Try exact match first
+    if area in POPULATION_PROXY:
+        return POPULATION_PROXY[area]
+    # Try partial match
+    for key, val in POPULATION_PROXY.items():
+        if key.lower() in area.lower() or area.lower() in key.lower():
+            return val
+    # Default fallback: return NaN (will skip calculation)
+    return np.nan
+
+def _load_population_table(cwd_files):
+    """
+    Find and parse a population-by-year table (ILOSTAT or UN population CSV).
+    Returns a frame with columns ["Area", "Year", "Population"], or None if no table is available.
+    """
+    exact_names = ["Population.csv", "population.csv", "Total population.csv", "Population by year.csv"]
+    found = next((n for n in exact_names if n in cwd_files), None)
+    if not found:
+        # "Employment to population ratio.csv" also contains the token, so exclude ratio files
+        candidates = [f for f in cwd_files if f.lower().endswith(".csv") and "ratio" not in f.lower()]
+        found = _find_file_by_tokens(["population"], candidates)
+    if not found:
+        return None
+
+    df = _read_csv_safe(found)
+    if df.empty:
+        return None
+    small = _extract_area_year_value(df, value_names=("total", "value", "observed_value", "obs_value", "poptotal", "population"))
+    if small is None:
+        st.warning(f"Could not infer columns Area/Year/Population in {found}; using static population proxies.", icon="⚠️")
+        return None
+
+    small = small.rename(columns={"Total": "Population"}).dropna(subset=["Population"])
+    st.info(f"Using year-resolved population panel from {found} ({small['Area'].nunique()} areas).", icon="👥")
+    return small
+
+def _attach_population(data, pop_table):
+    """
+    Add a year-resolved "Population" column to data.
+
+    Areas are mapped to integer codes and joined on a combined (area code, year) integer key.
+    Missing years are filled by linear interpolation within each area (flat beyond the
+    first/last observed year) using grouped forward/backward fills, so the whole panel is
+    interpolated in one vectorized pass. Areas absent from the table fall back to POPULATION_PROXY.
+    """
+    area_codes, areas = pd.factorize(data["Area"])
+    areas = pd.Index(areas)
+    years = pd.to_numeric(data["Year"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    population = np.full(len(data), np.nan)
+
+    if pop_table is not None and not pop_table.empty:
+        pop_codes = areas.get_indexer(pop_table["Area"])
+        pop_years = pd.to_numeric(pop_table["Year"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        keep = (pop_codes >= 0) & ~np.isnan(pop_years)
+
+        # Union of data keys (no value) and population keys (observed value)
+        valid = (area_codes >= 0) & ~np.isnan(years)
+        panel = pd.DataFrame({
+            "code": np.concatenate([area_codes[valid], pop_codes[keep]]).astype(np.int64),
+            "year": np.concatenate([years[valid], pop_years[keep]]).astype(np.int64),
+            "pop": np.concatenate([np.full(valid.sum(), np.nan), pop_table["Population"].to_numpy(dtype=float)[keep]]),
+        })
+        panel = panel.groupby(["code", "year"], sort=True)["pop"].first().reset_index()
+
+        # Linear interpolation between the nearest observed years within each area
+        known_year = panel["year"].where(panel["pop"].notna())
+        grouped_year = known_year.groupby(panel["code"])
+        grouped_pop = panel["pop"].groupby(panel["code"])
+        prev_y, next_y = grouped_year.ffill(), grouped_year.bfill()
+        prev_v, next_v = grouped_pop.ffill(), grouped_pop.bfill()
+        span = next_y - prev_y
+        frac = ((panel["year"] - prev_y) / span).where(span > 0, 0.0)
+        interp = (prev_v + (next_v - prev_v) * frac).fillna(prev_v).fillna(next_v)
+
+        # Integer-key join back onto the data rows (panel keys are sorted)
+        year_span = int(panel["year"].max() - panel["year"].min()) + 1
+        year_base = int(panel["year"].min())
+        panel_keys = panel["code"].to_numpy() * year_span + (panel["year"].to_numpy() - year_base)
+        row_keys = area_codes[valid].astype(np.int64) * year_span + (years[valid].astype(np.int64) - year_base)
+        pos = np.searchsorted(panel_keys, row_keys)
+        population[valid] = interp.to_numpy()[pos]
+
+    # Static proxy for areas without any population observation (one lookup per area, not per row)
+    missing = np.isnan(population) & (area_codes >= 0)
+    if missing.any():
+        proxy = np.array([_proxy_population(a) for a in areas], dtype=float)
+        population[missing] = proxy[area_codes[missing]]
+
+    data["Population"] = population
+    return data
+
+def apply_edm_model(data, model, beta=None):
+    """
+    (Re)compute the EDM columns of a prepared dataset in place, column-wise:
+    Beta, Beta_calibrated, EDM_raw = D(t), EDM_pct = (D(t) - D₀)/D₀ and EDM_index
+    (robust 0–1 scaling). Requires columns Employment (D₀), A and TimeYears.
+
+    beta: None for the model's β, or a Series of calibrated β indexed by Area
+          (e.g., calibrate_edm_beta(data)["beta"] where calibrated); missing areas use
+          the model's β. Beta_calibrated is True where the row's β came from the Series.
+    """
+    if isinstance(beta, pd.Series):
+        per_area = data["Area"].map(beta)
+        data["Beta_calibrated"] = per_area.notna().to_numpy()
+        data["Beta"] = per_area.fillna(model.beta).astype(float)
+    else:
+        data["Beta_calibrated"] = False
+        data["Beta"] = float(model.beta if beta is None else beta)
+
+    d0 = pd.to_numeric(data["Employment"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    data["EDM_raw"] = model.compute_edm_raw_array(
+        d0, data["A"].to_numpy(dtype=float), data["TimeYears"].to_numpy(dtype=float), beta=data["Beta"].to_numpy(dtype=float)
+    )
+
+    # EDM_pct = (D(t) - D₀)/D₀
+    with np.errstate(invalid="ignore", divide="ignore"):
+        data["EDM_pct"] = (data["EDM_raw"] - d0) / d0
+    data["EDM_pct"] = data["EDM_pct"].replace([np.inf, -np.inf], np.nan)
+
+    # Robust clipping and scale to 0..1 (1st-99th percentile)
+    if data["EDM_pct"].dropna().shape[0] > 0:
+        p1 = float(data["EDM_pct"].quantile(0.01))
+        p99 = float(data["EDM_pct"].quantile(0.99))
+        denom = p99 - p1 if (p99 - p1) != 0 else 1.0
+        data["EDM_index"] = (data["EDM_pct"].clip(lower=p1, upper=p99).fillna(p1) - p1) / denom
+    else:
+        st.warning("No EDM_pct values available (likely missing employment). Setting EDM_index=0 for visualization.", icon="⚠️")
+        data["EDM_index"] = 0.0
+
+    data["EDM_index"] = pd.to_numeric(data["EDM_index"], errors="coerce").fillna(0.0).clip(0.0, 1.0)
+    return data
+
+def _edm_beta(latest, model):
+    """
+    Model and per-country β for the latest rows of an EDM dataset: the Beta column
+    only if some β was calibrated (Beta_calibrated), otherwise None and a model
+    with the dataset's fixed β (or β = 0.3 without a Beta column).
+    """
+    if "Beta_calibrated" in latest.columns and latest["Beta_calibrated"].any():
+        return model or EDMModel(beta=0.3), latest["Beta"].to_numpy(dtype=float)
+    if model is None:
+        fixed = latest["Beta"].dropna() if "Beta" in latest.columns else pd.Series(dtype=float)
+        model = EDMModel(beta=float(fixed.iloc[0]) if len(fixed) else 0.3)
+    return model, None
+
+def project_edm_dataset(data, horizons, A_scenarios=None, beta_scenarios=None, model=None):
+    """
+    Displacement projection for the latest year of every country in an EDM dataset.
+    Uses each country's latest Employment as D₀, its A, and its Beta column when β was
+    calibrated (single scenario "calibrated"); otherwise the fixed β labels the scenario.
+    Returns a DisplacementProjection labeled by Area (see EDMModel.project for the scenario grids).
+    """
+    latest = data.dropna(subset=["Employment"]).sort_values("Year").drop_duplicates("Area", keep="last")
+    model, beta = _edm_beta(latest, model)
+    return model.project(
+        latest["Employment"].to_numpy(dtype=float),
+        latest["A"].to_numpy(dtype=float),
+        horizons,
+        A_scenarios=A_scenarios,
+        beta_scenarios=beta_scenarios,
+        countries=latest["Area"].to_numpy(),
+        beta=beta,
+    )
+
+def edm_time_to_threshold_surface(data, thresholds, A_values=None, model=None):
+    """
+    Years until each country's displacement reaches each threshold, for its own A
+    and optionally a grid of A values, computed as one country × threshold × A surface.
+
+    Returns a DataFrame indexed by Area with (threshold, A) column pairs; A == "own"
+    holds the country's latest A, e.g. surface[(0.5, "own")] ranks countries by
+    time to 50% displacement.
+    """
+    latest = data.sort_values("Year").drop_duplicates("Area", keep="last")
+    model, beta = _edm_beta(latest, model)
+    own_A = latest["A"].to_numpy(dtype=float)[:, np.newaxis]
+    A_labels = ["own"]
+    if A_values is not None and len(A_values) > 0:
+        grid = np.broadcast_to(np.asarray(A_values, dtype=float), (own_A.shape[0], len(A_values)))
+        own_A = np.hstack([own_A, grid])
+        A_labels += list(A_values)
+
+    thresholds = list(thresholds)
+    surface = model.compute_time_to_threshold_surface(own_A, thresholds, beta=beta)
+    columns = pd.MultiIndex.from_product([thresholds, A_labels], names=["threshold", "A"])
+    return pd.DataFrame(surface.reshape(surface.shape[0], -1), index=pd.Index(latest["Area"], name="Area"), columns=columns)
+
+def calibrate_edm_beta(data, model=None, min_obs=3, bounds=(0.0, None)):
+    """
+    Fit a per-country β from the multi-year Employment series of an EDM dataset.
+
+    log Employment(t) is regressed on A*t within each Area (see EDMModel.fit_beta);
+    all countries are solved in one batched computation.
+    Areas with too few usable years keep the model's β (calibrated == False), and so do
+    areas whose fitted slope falls outside bounds (clipped == True), e.g. a declining
+    displacement proxy giving β < 0: such a fit is rejected, not clipped to the bound.
+
+    Returns a DataFrame indexed by Area with columns:
+    beta (fitted slope, or the model's β where not calibrated), beta_fit (raw slope),
+    intercept, r2, rmse, n_obs, calibrated, clipped
+    """
+    model = model or EDMModel(beta=0.3)
+    codes, areas = pd.factorize(data["Area"])
+    fit = model.fit_beta(
+        codes,
+        pd.to_numeric(data["Employment"], errors="coerce").to_numpy(dtype=float, na_value=np.nan),
+        data["A"].to_numpy(dtype=float),
+        pd.to_numeric(data["TimeYears"], errors="coerce").to_numpy(dtype=float, na_value=np.nan),
+        min_obs=min_obs,
+    )
+    result = pd.DataFrame({
+        "beta_fit": fit["beta"],
+        "intercept": fit["intercept"],
+        "r2": fit["r2"],
+        "rmse": fit["rmse"],
+        "n_obs": fit["n_obs"],
+    }, index=pd.Index(areas, name="Area"))
+    lower, upper = bounds
+    in_bounds = np.ones(len(result), dtype=bool)
+    if lower is not None:
+        in_bounds &= (result["beta_fit"] >= lower).to_numpy()
+    if upper is not None:
+        in_bounds &= (result["beta_fit"] <= upper).to_numpy()
+    valid = np.asarray(fit["valid"], dtype=bool)
+    result["calibrated"] = valid & in_bounds
+    result["clipped"] = valid & ~in_bounds
+    result.insert(0, "beta", result["beta_fit"].where(result["calibrated"], model.beta))
+    return result
+
+def edm_dataset_version(data):
+    """Content fingerprint of an EDM dataset, used as cache key for derived surfaces."""
+    hashed = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
 def load_edm_dataset():
     st.info("Searching folder for ILOSTAT CSVs (flexible filename matching)...", icon="🔍")
 
@@ -75,43 +439,10 @@ def load_edm_dataset():
             st.warning(f"File {found} was empty or couldn't be parsed; skipping.", icon="⚠️")
             continue
 
-        # attempt to find Area, Year, and a numeric value column
-        cols_lower = [c.lower() for c in df.columns]
-        # find area column
-        area_col = next((c for c in df.columns if c.lower() in ("area", "country", "country or area", "location", "geo")), None)
-        # find year column
-        year_col = next((c for c in df.columns if "year" in c.lower() or c.lower() in ("time", "period")), None)
-        # find total/value column: prefer "total" or a numeric column
-        total_col = next((c for c in df.columns if c.lower() in ("total","value","observed_value","obs_value")), None)
-        if total_col is None:
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-            # prefer columns that are not year if possible
-            if year_col and year_col in numeric_cols and len(numeric_cols) > 1:
-                numeric_cols = [c for c in numeric_cols if c != year_col]
-            total_col = numeric_cols[0] if numeric_cols else None
-
-        # fallback inference if necessary
-        if area_col is None:
-            str_cols = df.select_dtypes(include=['object']).columns.tolist()
-            area_col = str_cols[0] if str_cols else None
-        if year_col is None:
-            # try find integer-like column
-            cand = next((c for c in df.columns if df[c].dropna().apply(lambda v: isinstance(v, (int, np.integer))).all()), None)
-            year_col = cand
-        if not (area_col and year_col and total_col):
+        small = _extract_area_year_value(df)
+        if small is None:
             st.warning(f"Could not infer columns Area/Year/Value in {found}. Skipping this file.", icon="⚠️")
             continue
-
-        small = df[[area_col, year_col, total_col]].copy()
-        small.columns = ["Area", "Year", "Total"]
-        small["Area"] = small["Area"].astype(str).str.strip()
-        # coerce Year to int where possible
-        try:
-            small["Year"] = small["Year"].astype(int)
-        except Exception:
-            small["Year"] = pd.to_numeric(small["Year"], errors="coerce").astype('Int64')
-        small["Total"] = pd.to_numeric(small["Total"], errors="coerce")
-        small.dropna(subset=["Area", "Year"], inplace=True)
         dfs[key] = small.rename(columns={"Total": key})
 
     if not dfs:
@@ -148,170 +479,26 @@ def load_edm_dataset():
     # Derive Employment from EmpPop Ratio and Population
     # ========================================================================
     # Employment = EmpPop_ratio * Population
-    # We estimate Population from World Bank or use a proxy
-    
-    # Create a mapping of countries to approximate populations (simplified)
-    population_proxy = {
-        "India": 1417173000,
-        "China": 1425887337,
-        "United States": 338289857,
-        "Indonesia": 277534122,
-        "Pakistan": 240485658,
-        "Brazil": 215313498,
-        "Nigeria": 223804632,
-        "Bangladesh": 171186372,
-        "Russia": 144444359,
-        "Mexico": 128932753,
-        "Japan": 123294513,
-        "Ethiopia": 130000000,
-        "Philippines": 120595548,
-        "Egypt": 110000000,
-        "Germany": 84405100,
-        "Vietnam": 98186856,
-        "DR Congo": 99010000,
-        "Turkey": 86749700,
-        "Iran": 91567416,
-        "Thailand": 71801915,
-        "United Kingdom": 67736802,
-        "Tanzania": 65497748,
-        "France": 68017000,
-        "South Africa": 60142978,
-        "Kenya": 54054487,
-        "Myanmar": 54732500,
-        "Sudan": 47753632,
-        "Uganda": 48582220,
-        "Angola": 36815961,
-        "Algeria": 44945000,
-        "Iraq": 43533592,
-        "Canada": 39742154,
-        "Afghanistan": 42972958,
-        "Ukraine": 38000000,
-        "Saudi Arabia": 36408820,
-        "Morocco": 38081755,
-        "Uzbekistan": 35896996,
-        "Malaysia": 34305500,
-        "Yemen": 34449825,
-        "Peru": 34352719,
-        "Angola": 36815961,
-        "Australia": 26603400,
-        "Colombia": 52085168,
-        "Sri Lanka": 22156000,
-        "Syria": 22125490,
-        "Poland": 37654000,
-        "Romania": 18970458,
-        "Chile": 19600000,
-        "Kazakhstan": 20331129,
-        "Tajikistan": 10143200,
-        "Netherlands": 17750000,
-        "South Korea": 51908400,
-        "Greece": 10640801,
-        "Portugal": 10426199,
-        "Austria": 9108202,
-        "Hungary": 9673107,
-        "Sweden": 10549347,
-        "Azerbaijan": 10139177,
-        "Belgium": 11690814,
-        "Tunisia": 12356117,
-        "Cuba": 10500981,
-        "Czech Republic": 10510785,
-        "Greece": 10640801,
-        "Israel": 9656842,
-        "Switzerland": 8776000,
-        "Bulgaria": 6840000,
-        "Serbia": 6690121,
-        "Hong Kong": 7685600,
-        "Denmark": 5903037,
-        "Singapore": 5917600,
-        "Slovakia": 5460721,
-        "Finland": 5571665,
-        "Norway": 5547933,
-        "Ireland": 5127900,
-        "New Zealand": 5228100,
-        "Costa Rica": 5180829,
-        "Lebanon": 5489094,
-        "Panama": 4408581,
-        "Iceland": 397413,
-        "Luxembourg": 683201,
-    }
+    # Population comes from a population-by-year table when available, else a static proxy
+    data = _attach_population(data, _load_population_table(cwd_files))
 
-    # Estimate population from country name if not in ILOSTAT
-    def get_population(area):
-        # Try exact match first
-        if area in population_proxy:
-            return population_proxy[area]
-        # Try partial match
-        for key, val in population_proxy.items():
-            if key.lower() in area.lower() or area.lower() in key.lower():
-                return val
-        # Default fallback: return None (will skip calculation)
-        return None
-
-    data["Population"] = data["Area"].apply(get_population)
-    
     # Calculate Employment = (EmpPop / 100) * Population
     # EmpPop is typically in percentage (0-100), so divide by 100
-    def calc_employment(row):
-        emp_pop = row.get("EmpPop")
-        pop = row.get("Population")
-        
-        if pd.isna(emp_pop) or pd.isna(pop) or pop is None:
-            return np.nan
-        
-        # Assume EmpPop is in percentage
-        try:
-            emp_ratio = float(emp_pop) / 100.0 if float(emp_pop) > 1 else float(emp_pop)
-            return emp_ratio * pop
-        except Exception:
-            return np.nan
-    
-    data["Employment"] = data.apply(calc_employment, axis=1)
+    emp_pop = pd.to_numeric(data["EmpPop"], errors="coerce") if "EmpPop" in data.columns else pd.Series(np.nan, index=data.index)
+    emp_ratio = emp_pop.where(emp_pop <= 1, emp_pop / 100.0)
+    data["Employment"] = emp_ratio * data["Population"]
 
-    st.info(f"✓ Calculated Employment from Employment-to-Population ratio and population proxy. {data['Employment'].notna().sum()} rows with valid employment data.", icon="✅")
+    st.info(f"✓ Calculated Employment from Employment-to-Population ratio and population. {data['Employment'].notna().sum()} rows with valid employment data.", icon="✅")
 
     # Time horizon: compute years from first available year per country
     data["Year"] = pd.to_numeric(data["Year"], errors="coerce")
     data["YearMin"] = data.groupby("Area")["Year"].transform("min")
     data["TimeYears"] = (data["Year"] - data["YearMin"]).fillna(0)
 
-    # Compute EDM_raw using EDMModel (beta default 0.3)
-    model = EDMModel(beta=0.3)
-    def safe_edm(row):
-        d0 = row.get("Employment")
-        a = row.get("A", 0.0)
-        t = row.get("TimeYears", 0.0)
-        if pd.isna(d0) or d0 <= 0:
-            return np.nan
-        try:
-            return model.compute_edm_raw(float(d0), float(a), float(t))
-        except Exception:
-            return np.nan
-
-    data["EDM_raw"] = data.apply(safe_edm, axis=1)
-
-    # EDM_pct = (D(t) - D₀)/D₀
-    def safe_pct(row):
-        d0 = row.get("Employment")
-        d = row.get("EDM_raw")
-        if pd.isna(d0) or pd.isna(d) or d0 == 0:
-            return np.nan
-        return (d - d0) / d0
-
-    data["EDM_pct"] = data.apply(safe_pct, axis=1)
-    data["EDM_pct"] = data["EDM_pct"].replace([np.inf, -np.inf], np.nan)
-
-    # Robust clipping and scale to 0..1 (1st-99th percentile)
-    if data["EDM_pct"].dropna().shape[0] > 0:
-        p1 = float(data["EDM_pct"].quantile(0.01))
-        p99 = float(data["EDM_pct"].quantile(0.99))
-        denom = p99 - p1 if (p99 - p1) != 0 else 1.0
-        data["EDM_index"] = data["EDM_pct"].clip(lower=p1, upper=p99).fillna(p1).apply(lambda v: (v - p1) / denom)
-    else:
-        st.warning("No EDM_pct values available (likely missing employment). Setting EDM_index=0 for visualization.", icon="⚠️")
-        data["EDM_index"] = 0.0
-
-    data["EDM_index"] = pd.to_numeric(data["EDM_index"], errors="coerce").fillna(0.0).clip(0.0, 1.0)
+    # Compute EDM_raw / EDM_pct / EDM_index using EDMModel (beta default 0.3)
+    data = apply_edm_model(data, EDMModel(beta=0.3))
 
-    out = data[["Area", "Year", "A", "Employment", "Population", "EmpPop", "Unemp", "TimeYears", "EDM_raw", "EDM_pct", "EDM_index"]].copy()
+    out = data[["Area", "Year", "A", "Employment", "Population", "EmpPop", "Unemp", "TimeYears", "Beta", "EDM_raw", "EDM_pct", "EDM_index"]].copy()
     out = out.sort_values(by=["Area", "Year"]).reset_index(drop=True)
     st.success(f"EDM loader prepared {out.shape[0]} rows from {len(dfs)} source files.", icon="✅")
     return out
\ No newline at end of file
@@ -96,6 +96,139 @@ class EDMModel:
         
         return float(np.clip(edm_index, 0.0, 1.0))
 
+    # --------------------------------------------------------
+    # Raw Displacement (vectorized, element-wise)
+    # --------------------------------------------------------
+    def compute_edm_raw_array(self, baseline_jobs, A, time_years, beta=None):
+        """
+        Element-wise D(t) = D₀ * e^(βAt) over arrays (same rules as compute_edm_raw).
+
+        Args:
+            baseline_jobs: Array of initial jobs at risk (D₀)
+            A: Array of automation speeds (0-1)
+            time_years: Array of time horizons in years (t)
+            beta: Optional β override, scalar or array (e.g., calibrated per country)
+
+        Returns:
+            ndarray of displaced jobs (NaN where D₀ <= 0, t < 0 or any input is missing)
+        """
+        d0 = np.asarray(baseline_jobs, dtype=float)
+        A = np.asarray(A, dtype=float)
+        t = np.asarray(time_years, dtype=float)
+        beta = np.asarray(self.beta if beta is None else beta, dtype=float)
+
+        # Guard against overflow
+        exponent = np.minimum(beta * A * t, 100.0)
+        with np.errstate(invalid="ignore"):
+            D = d0 * np.exp(exponent)
+            return np.where((d0 > 0) & (t >= 0), D, np.nan)
+
+    # --------------------------------------------------------
+    # Displacement Projection (countries × horizons × scenarios)
+    # --------------------------------------------------------
+    def project(self, baseline_jobs, A, horizons, A_scenarios=None, beta_scenarios=None, countries=None, beta=None):
+        """
+        Broadcast D(t) = D₀ * e^(βAt) over every country, horizon and scenario.
+
+        Args:
+            baseline_jobs: Array of D₀ per country, shape (n,)
+            A: Array of automation speed per country, shape (n,)
+            horizons: Time horizons in years, shape (h,)
+            A_scenarios: Optional grid of automation speeds replacing each country's A
+            beta_scenarios: Optional grid of β values (each country keeps its own A)
+            countries: Optional country labels (defaults to 0..n-1)
+            beta: Optional per-country β, shape (n,), used instead of the model's β
+                  when no beta_scenarios grid is given
+
+        Returns:
+            DisplacementProjection with dims (country, horizon, scenario).
+            Without a scenario grid there is a single scenario using the model's β
+            (labelled "calibrated" when a per-country beta is supplied).
+        """
+        if A_scenarios is not None and beta_scenarios is not None:
+            raise ValueError("Pass either A_scenarios or beta_scenarios, not both.")
+
+        d0 = np.asarray(baseline_jobs, dtype=float).ravel()
+        A = np.broadcast_to(np.asarray(A, dtype=float), d0.shape)
+        horizons = np.asarray(horizons, dtype=float).ravel()
+        country_beta = self.beta if beta is None else np.asarray(beta, dtype=float).reshape(-1, 1)
+
+        if A_scenarios is not None:
+            scenarios = np.asarray(A_scenarios, dtype=float).ravel()
+            rate = country_beta * scenarios[np.newaxis, :]
+            scenario_name = "A"
+        elif beta_scenarios is not None:
+            scenarios = np.asarray(beta_scenarios, dtype=float).ravel()
+            rate = A[:, np.newaxis] * scenarios[np.newaxis, :]
+            scenario_name = "beta"
+        else:
+            scenarios = np.array([self.beta]) if beta is None else np.array(["calibrated"], dtype=object)
+            rate = country_beta * A[:, np.newaxis]
+            scenario_name = "beta"
+
+        if countries is None:
+            countries = np.arange(d0.shape[0])
+        return DisplacementProjection(d0, rate, horizons, countries, scenarios, scenario_name)
+
+    # --------------------------------------------------------
+    # Batched β Calibration (log-linear least squares)
+    # --------------------------------------------------------
+    def fit_beta(self, group_codes, displaced, A, time_years, min_obs=3):
+        """
+        Fit β for many groups (countries) at once from observed series.
+
+        Since log D(t) = log D₀ + β(At), β is the OLS slope of log D on x = A*t
+        within each group. All groups are solved together with bincount-based
+        grouped sums (no Python loop over groups).
+
+        Args:
+            group_codes: Integer group code per observation (0..G-1, negative = skip)
+            displaced: Observed D(t) per observation (must be > 0)
+            A: Automation speed per observation
+            time_years: Years since the group's baseline per observation
+            min_obs: Minimum observations for a valid fit
+
+        Returns:
+            dict of arrays of length G: beta, intercept, r2, rmse, n_obs, valid
+        """
+        codes = np.asarray(group_codes)
+        D = np.asarray(displaced, dtype=float)
+        x = np.asarray(A, dtype=float) * np.asarray(time_years, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            y = np.log(D)
+
+        keep = (codes >= 0) & np.isfinite(x) & np.isfinite(y)
+        n_groups = int(codes.max()) + 1 if codes.size else 0
+        codes, x, y = codes[keep], x[keep], y[keep]
+
+        n = np.bincount(codes, minlength=n_groups).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = np.bincount(codes, weights=x, minlength=n_groups) / n
+            y_mean = np.bincount(codes, weights=y, minlength=n_groups) / n
+
+            # Centered sums per group (second pass for numerical stability)
+            dx = x - x_mean[codes]
+            dy = y - y_mean[codes]
+            sxx = np.bincount(codes, weights=dx * dx, minlength=n_groups)
+            sxy = np.bincount(codes, weights=dx * dy, minlength=n_groups)
+            syy = np.bincount(codes, weights=dy * dy, minlength=n_groups)
+
+            beta = sxy / sxx
+            intercept = y_mean - beta * x_mean
+            ssr = np.maximum(syy - beta * sxy, 0.0)
+            r2 = np.where(syy > 0, 1.0 - ssr / syy, np.nan)
+            rmse = np.sqrt(ssr / n)
+
+        valid = (n >= min_obs) & (sxx > 1e-12)
+        return {
+            "beta": np.where(valid, beta, np.nan),
+            "intercept": np.where(valid, intercept, np.nan),
+            "r2": np.where(valid, r2, np.nan),
+            "rmse": np.where(valid, rmse, np.nan),
+            "n_obs": n.astype(int),
+            "valid": valid,
+        }
+
     # --------------------------------------------------------
     # Time to Displacement Threshold
     # --------------------------------------------------------
@@ -127,6 +260,36 @@ class EDMModel:
         except (ValueError, ZeroDivisionError):
             return np.nan
 
+    # --------------------------------------------------------
+    # Time to Threshold Surface (countries × thresholds × A)
+    # --------------------------------------------------------
+    def compute_time_to_threshold_surface(self, A, thresholds, beta=None):
+        """
+        Vectorized compute_time_to_threshold: t = ln(1 + threshold) / (βA)
+        for every country, threshold and A value in one pass.
+
+        Args:
+            A: Automation speeds, shape (n,) for one value per country
+               or (n, k) for k A values per country
+            thresholds: Displacement thresholds, shape (m,) (e.g., 0.5 = 50%)
+            beta: Optional β override, scalar or shape (n,) (defaults to self.beta)
+
+        Returns:
+            ndarray of shape (n, m, k) in years (NaN where βA <= 0 or A is missing)
+        """
+        A = np.asarray(A, dtype=float)
+        if A.ndim == 1:
+            A = A[:, np.newaxis]
+        beta = np.asarray(self.beta if beta is None else beta, dtype=float)
+        if beta.ndim == 1:
+            beta = beta[:, np.newaxis]
+
+        rate = (beta * A)[:, np.newaxis, :]  # (n, 1, k)
+        log_target = np.log1p(np.asarray(thresholds, dtype=float))[np.newaxis, :, np.newaxis]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            years = np.maximum(log_target / rate, 0.0)
+        return np.where(rate > 0, years, np.nan)
+
     # --------------------------------------------------------
     # Generic normalizer for any series (used in loader)
     # --------------------------------------------------------
@@ -135,4 +298,107 @@ class EDMModel:
         series = pd.to_numeric(series, errors="coerce")
         if series.isna().all():
             return series
-        return (series - series.min()) / (series.max() - series.min() + 1e-9)
\ No newline at end of file
+        return (series - series.min()) / (series.max() - series.min() + 1e-9)
+
+
+class DisplacementProjection:
+    """
+    Labeled, lazily materialized D(t) = D₀ * e^(βAt) array.
+
+    Dimensions: (country, horizon, scenario). Only the inputs are stored;
+    D(t) is evaluated with one broadcast NumPy expression on first access of
+    `values` / `percent` and then cached. `sel` slices the inputs, so taking
+    a few countries or one scenario never evaluates the full tensor.
+    """
+
+    dims = ("country", "horizon", "scenario")
+
+    def __init__(self, baseline_jobs, rate, horizons, countries, scenarios, scenario_name="scenario"):
+        self._d0 = np.asarray(baseline_jobs, dtype=float)
+        self._rate = np.asarray(rate, dtype=float)  # β*A, shape (n or 1, s)
+        self._horizons = np.asarray(horizons, dtype=float)
+        self.coords = {
+            "country": pd.Index(countries, name="country"),
+            "horizon": pd.Index(self._horizons, name="horizon"),
+            "scenario": pd.Index(scenarios, name=scenario_name),
+        }
+        self.scenario_name = scenario_name
+        self._exponent = None
+        self._values = None
+
+    @property
+    def shape(self):
+        return tuple(len(self.coords[d]) for d in self.dims)
+
+    def __repr__(self):
+        state = "materialized" if self._values is not None else "lazy"
+        return f"DisplacementProjection(shape={self.shape}, scenario={self.scenario_name!r}, {state})"
+
+    # --------------------------------------------------------
+    # Evaluation
+    # --------------------------------------------------------
+    def _get_exponent(self):
+        if self._exponent is None:
+            # (n|1, 1, s) * (1, h, 1) -> (n|1, h, s); guard against overflow
+            exponent = self._rate[:, np.newaxis, :] * self._horizons[np.newaxis, :, np.newaxis]
+            self._exponent = np.minimum(exponent, 100.0)
+        return self._exponent
+
+    @property
+    def values(self):
+        """Displaced jobs D(t), shape (country, horizon, scenario)."""
+        if self._values is None:
+            d0 = self._d0[:, np.newaxis, np.newaxis]
+            valid = (d0 > 0) & (self._horizons[np.newaxis, :, np.newaxis] >= 0)
+            with np.errstate(invalid="ignore"):
+                self._values = np.where(valid, d0 * np.exp(self._get_exponent()), np.nan)
+        return self._values
+
+    @property
+    def percent(self):
+        """Fractional increase (D(t) - D₀) / D₀, same shape as values."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.values / self._d0[:, np.newaxis, np.newaxis] - 1.0
+
+    # --------------------------------------------------------
+    # Label-based selection (stays lazy)
+    # --------------------------------------------------------
+    def sel(self, country=None, horizon=None, scenario=None):
+        """
+        Select by labels along any dimension. Scalars and lists are both accepted;
+        the result is always 3-D and is evaluated only when its values are read.
+        """
+        def positions(dim, labels):
+            index = self.coords[dim]
+            if labels is None:
+                return np.arange(len(index))
+            labels = np.atleast_1d(labels)
+            pos = index.get_indexer(labels)
+            if (pos < 0).any():
+                raise KeyError(f"{list(labels[pos < 0])} not found in {dim}")
+            return pos
+
+        ci = positions("country", country)
+        hi = positions("horizon", horizon)
+        si = positions("scenario", scenario)
+
+        rate = self._rate[:, si]
+        if rate.shape[0] > 1:
+            rate = rate[ci]
+        return DisplacementProjection(
+            self._d0[ci], rate, self._horizons[hi],
+            self.coords["country"][ci], self.coords["scenario"][si], self.scenario_name,
+        )
+
+    def to_frame(self, metric="values"):
+        """
+        Long-format DataFrame with one row per (country, horizon, scenario).
+        metric: "values" for D(t) or "percent" for (D(t) - D₀) / D₀.
+        """
+        data = self.values if metric == "values" else self.percent
+        index = pd.MultiIndex.from_product(
+            [self.coords[d] for d in self.dims],
+            names=["country", "horizon", self.scenario_name],
+        )
+        column = "D" if metric == "values" else "D_pct"
+        return pd.DataFrame({column: data.reshape(-1)}, index=index).reset_index()
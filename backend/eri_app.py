@@ -3,9 +3,14 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from eri_model import ERIModel
+from eri_model import ERIModel, ERI_MODES
 from eri_data_loader import load_ilostat_data
 
+
+@st.cache_data(show_spinner=False)
+def load_ilostat_data_cached():
+    return load_ilostat_data()
+
 # ---------------------------
 # Custom CSS for Cyan/Teal Theme with Glowing Effects
 # ---------------------------
@@ -430,13 +435,22 @@ elif mode == "ILOSTAT Dataset":
     </p>
     """, unsafe_allow_html=True)
 
-    # Load dataset
-    data = load_ilostat_data()
+    # Load dataset (all curve modes are precomputed, so switching mode doesn't reload)
+    data = load_ilostat_data_cached()
     data = data.dropna(subset=["ERI"])
 
+    curve_mode = st.selectbox(
+        "Select ERI Model Type:",
+        ERI_MODES,
+        key="dataset_curve_mode"
+    )
+
     if data.empty:
         st.warning("⚠️ No ERI data available. Ensure all ILOSTAT CSVs are in the same folder.")
     else:
+        # Switch the displayed ERI to the selected curve mode
+        data = data.assign(ERI=data["ERI_" + curve_mode], Risk=data["Risk_" + curve_mode])
+
         # Get latest year per country
         latest = data.sort_values("Year").drop_duplicates("Area", keep="last")
 
@@ -460,11 +474,12 @@ elif mode == "ILOSTAT Dataset":
             hover_data={
                 "Year": True,
                 "ERI": ":.3f",
+                "Risk": True,
                 "A": ":.2f",
                 "W": ":.2f",
                 "S": ":.2f"
             },
-            title="Global Employment Risk Index (Latest Year)"
+            title=f"Global Employment Risk Index – {curve_mode.capitalize()} Model (Latest Year)"
         )
 
         fig_map.update_traces(
@@ -585,7 +600,7 @@ elif mode == "ILOSTAT Dataset":
         """, unsafe_allow_html=True)
         
         st.dataframe(
-            latest[["Area", "Year", "A", "W", "S", "ERI"]].sort_values(by="ERI", ascending=False),
+            latest[["Area", "Year", "A", "W", "S", "ERI", "Risk"]].sort_values(by="ERI", ascending=False),
             use_container_width=True,
             height=500
         )
@@ -1,6 +1,6 @@
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
-from eri_model import ERIModel
+from eri_model import ERIModel, ERI_MODES
 
 def load_ilostat_data():
     # Filenames (adjust if needed)
@@ -51,12 +51,18 @@ def load_ilostat_data():
          + (1 - data["NEET_norm"].fillna(0.5))) / 4
     )
 
-    # Compute ERI
+    # Compute ERI for all curve modes in one pass (ERI = linear, the default mode)
     model = ERIModel()
-    data["ERI"] = data.apply(lambda row: model.compute_eri(row["A"], row["W"], row["S"]), axis=1)
+    eri_by_mode = model.compute_eri_all_modes(data["A"].to_numpy(), data["W"].to_numpy(), data["S"].to_numpy())
+    eri_cols = []
+    for mode in ERI_MODES:
+        data["ERI_" + mode] = eri_by_mode[mode]
+        data["Risk_" + mode] = model.interpret_array(eri_by_mode[mode])
+        eri_cols += ["ERI_" + mode, "Risk_" + mode]
+    data["ERI"] = data["ERI_linear"]
 
     # Clean output
     data = data.dropna(subset=["ERI"])
     data = data.sort_values(by=["Area", "Year"])
 
-    return data[["Area", "Year", "A", "W", "S", "ERI"]]
+    return data[["Area", "Year", "A", "W", "S", "ERI"] + eri_cols]
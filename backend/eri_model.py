@@ -12,6 +12,9 @@ import numpy as np
 import pandas as pd
 
 
+ERI_MODES = ["linear", "quadratic", "exponential", "logistic"]
+
+
 class ERIModel:
     def __init__(self, weight_A=1.0, weight_W=1.0, weight_S=1.0):
         self.weight_A = weight_A
@@ -47,6 +50,26 @@ class ERIModel:
 
         return round(float(eri), 4)
 
+    def compute_eri_all_modes(self, A, W, S):
+        """
+        Compute ERI for every curve mode in one vectorized pass over A/W/S arrays.
+        Each value is clipped to [0, 1] (the per-value normalization used by compute_eri).
+        Returns a dict mode -> ndarray, rounded like compute_eri.
+        """
+        A = np.clip(np.asarray(A, dtype=float), 0, 1)
+        W = np.clip(np.asarray(W, dtype=float), 0, 1)
+        S = np.clip(np.asarray(S, dtype=float), 0, 1)
+
+        scale = W / (S + 1)  # shared by all modes
+        k = 10  # controls steepness (logistic)
+        eri = {
+            "linear": A * scale,
+            "quadratic": A**2 * scale,
+            "exponential": (np.exp(A) - 1) * scale,
+            "logistic": scale * (1 / (1 + np.exp(-k * (A - 0.5)))),
+        }
+        return {mode: np.round(values, 4) for mode, values in eri.items()}
+
     def interpret(self, eri_value):
         if eri_value < 0.2:
             return "Low Employment Risk"
@@ -55,6 +78,15 @@ class ERIModel:
         else:
             return "High Employment Risk"
 
+    def interpret_array(self, eri_values):
+        """Vectorized interpret(): risk band label for each ERI value (NaN -> None)."""
+        eri_values = np.asarray(eri_values, dtype=float)
+        labels = np.array(["Low Employment Risk", "Moderate Employment Risk", "High Employment Risk"], dtype=object)
+        # thresholds as in interpret(): < 0.2 low, < 0.6 moderate, else high
+        bands = labels[np.searchsorted([0.2, 0.6], eri_values, side="right")]
+        bands[np.isnan(eri_values)] = None
+        return bands
+
     def simulate_scenarios(self, A_values, W, S, mode="linear"):
         results = []
         for A in A_values:
@@ -4,7 +4,8 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from onet_data_loader import load_onet_analysis
+from onet_data_loader import compare_onet_releases, list_release_zips, load_onet_analysis
+from onet_model import DEFAULT_RISK_WEIGHTS
 
 # ---------------------------
 # Custom CSS for Green Theme
@@ -186,20 +187,40 @@ view_mode = st.sidebar.radio("Select View:", [
     "Automation Risk Analysis",
     "Skills & Transferability",
     "Technology Requirements",
-    "Detailed Occupations"
+    "Detailed Occupations",
+    "Task Search",
+    "Release Comparison",
+    "Occupation Clusters",
+    "Occupation Landscape",
+    "Country Exposure"
 ])
 
-# Load data
-risk_df, skills_df, tech_df = load_onet_analysis()
+st.sidebar.header("⚖️ Risk Weights")
+risk_weights = {
+    name: st.sidebar.slider(f"{name}:", 0.0, 1.0, default, 0.05)
+    for name, default in DEFAULT_RISK_WEIGHTS.items()
+}
+st.sidebar.caption("Cognitive Complexity and Human Interaction lower risk (they enter as 1 − value).")
 
-if risk_df.empty:
+# Discover data; each view requests only the analyses it shows, which are
+# computed on first access and memoized per data version
+onet_analysis = load_onet_analysis()
+
+if onet_analysis is None:
     st.error("❌ No O*NET data loaded. Please ensure O*NET CSV files are in the current directory.")
-    st.info("📌 Required files: Occupations.csv, Task Statements.csv, Skills.csv, Knowledge.csv, Abilities.csv, Technology Skills.csv")
+    st.info("📌 Required files: Occupations.csv, Task Statements.csv, Skills.csv, Knowledge.csv, Abilities.csv, Technology Skills.csv, Work Activities.csv, Work Context.csv")
 else:
+    onet_loader = onet_analysis.loader
+    # Risk scores back every view except Technology Requirements and Release Comparison
+    risk_df = onet_analysis.risk(risk_weights) if view_mode not in ("Technology Requirements", "Release Comparison") else None
+    
+    if risk_df is not None and risk_df.empty:
+        st.error("❌ Automation risk could not be computed. Please ensure Occupation Data is in the current directory.")
+    
     # ==============================================================
     # 1️⃣ DASHBOARD OVERVIEW
     # ==============================================================
-    if view_mode == "Dashboard Overview":
+    elif view_mode == "Dashboard Overview":
         st.markdown("""
             <div class="section-header">
                 <h2>📊 O*NET Database Overview</h2>
@@ -310,6 +331,43 @@ else:
                 font=dict(color="#e0e0e0")
             )
             st.plotly_chart(fig_low, use_container_width=True)
+        
+        st.divider()
+        st.markdown("""
+        <div class="section-header">
+            <h2>🗂️ Risk by SOC Group</h2>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        rollups = onet_analysis.soc_rollups(risk_weights)
+        if not rollups.empty:
+            labels = np.where(rollups["Title"] != "", rollups["SOC Code"] + " " + rollups["Title"], rollups["SOC Code"])
+            fig_soc = go.Figure(go.Treemap(
+                ids=rollups["SOC Code"],
+                labels=labels,
+                parents=rollups["Parent"],
+                values=rollups["Occupations"],
+                branchvalues="total",
+                maxdepth=2,
+                marker=dict(colors=rollups["Mean Risk"], colorscale="RdYlGn_r", cmin=0, cmax=1,
+                            colorbar=dict(title="Mean Risk")),
+                hovertemplate="%{label}<br>Occupations: %{value}<br>Mean Risk: %{color:.3f}<extra></extra>"
+            ))
+            fig_soc.update_layout(
+                height=600,
+                margin=dict(t=20, l=10, r=10, b=10),
+                paper_bgcolor="rgba(26, 31, 46, 0.9)",
+                font=dict(color="#e0e0e0")
+            )
+            st.plotly_chart(fig_soc, use_container_width=True)
+            
+            soc_level = st.selectbox("SOC Level:", rollups["Level"].unique().tolist())
+            st.dataframe(
+                rollups[rollups["Level"] == soc_level].drop(columns=["Level"]).sort_values("Mean Risk", ascending=False),
+                use_container_width=True
+            )
+        else:
+            st.info("SOC roll-ups are not available.")
     
     # ==============================================================
     # 3️⃣ SKILLS & TRANSFERABILITY
@@ -321,6 +379,8 @@ else:
             </div>
         """, unsafe_allow_html=True)
         
+        skills_df = onet_analysis.skills()
+        transitions_df = onet_analysis.transitions(risk_weights)
         if not skills_df.empty:
             skill_summary = skills_df["Transferability"].value_counts()
             
@@ -352,6 +412,54 @@ else:
             )
         else:
             st.warning("⚠️ Skills data not available")
+
+        st.divider()
+        st.markdown("""
+        <div class="section-header">
+            <h2>🔀 Transition Recommendations (High → Lower Risk)</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+        if not transitions_df.empty:
+            sources = transitions_df.drop_duplicates("O*NET Code").sort_values("Automation Risk Score", ascending=False)
+            selected_occupation = st.selectbox(
+                "High-risk occupation:",
+                sources["O*NET Code"].tolist(),
+                format_func=lambda code: f"{sources.set_index('O*NET Code').at[code, 'Occupation']} ({code})"
+            )
+            st.dataframe(
+                transitions_df[transitions_df["O*NET Code"] == selected_occupation][
+                    ["Rank", "Transition Occupation", "Transition Code", "Transition Risk Score", "Similarity"]
+                ],
+                use_container_width=True
+            )
+        else:
+            st.info("No transition recommendations available (requires Skills and Knowledge data).")
+
+        st.divider()
+        st.markdown("""
+        <div class="section-header">
+            <h2>🧭 Retraining Path Finder</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+        occupation_titles = risk_df.drop_duplicates("O*NET Code").set_index("O*NET Code")["Occupation"]
+        ranked_codes = risk_df.sort_values("Automation Risk Score", ascending=False)["O*NET Code"].drop_duplicates().tolist()
+        path_col1, path_col2, path_col3 = st.columns(3)
+        with path_col1:
+            path_source = st.selectbox("From (current occupation):", ranked_codes,
+                                       format_func=lambda code: f"{occupation_titles.get(code, code)} ({code})")
+        with path_col2:
+            path_target = st.selectbox("To (target occupation):", ranked_codes[::-1],
+                                       format_func=lambda code: f"{occupation_titles.get(code, code)} ({code})")
+        with path_col3:
+            risk_weight = st.slider("Risk Weight in Route Cost:", 0.0, 3.0, 1.0, 0.1)
+
+        path_df = onet_loader.find_retraining_path(risk_df, path_source, path_target, risk_weight=risk_weight)
+        if not path_df.empty:
+            st.dataframe(path_df, use_container_width=True)
+        else:
+            st.info("No route found between these occupations in the similarity graph.")
     
     # ==============================================================
     # 4️⃣ TECHNOLOGY REQUIREMENTS
@@ -363,26 +471,60 @@ else:
             </div>
         """, unsafe_allow_html=True)
         
+        tech_df = onet_analysis.technology()
         if not tech_df.empty:
+            top_n = st.slider("Technologies to Show:", 10, 50, 25, 5)
+            rankings = onet_analysis.technology_rankings(top_n)
+            top_tech = rankings["technology"]
+            
+            tech_col1, tech_col2, tech_col3 = st.columns(3)
+            with tech_col1:
+                st.metric("🧰 Distinct Technologies", len(tech_df))
+            with tech_col2:
+                if "Hot Technology" in tech_df.columns:
+                    st.metric("🔥 Hot Technologies", int(tech_df["Hot Technology"].sum()))
+            with tech_col3:
+                if "Commodity" in tech_df.columns:
+                    st.metric("📦 Commodity Categories", tech_df["Commodity"].nunique())
+            
             fig_tech = go.Figure(go.Bar(
-                x=tech_df["Adoption Normalized"],
-                y=tech_df["Technology"],
+                x=top_tech["Adoption Normalized"],
+                y=top_tech["Technology"],
                 orientation="h",
-                marker=dict(color=tech_df["Adoption Normalized"], colorscale="Viridis",
+                marker=dict(color=top_tech["Adoption Normalized"], colorscale="Viridis",
                            line=dict(width=1, color="#ffffff")),
-                text=[f"{v:.2%}" for v in tech_df["Adoption Normalized"]],
-                textposition="outside"
+                text=[f"{v:.2%}" for v in top_tech["Adoption Normalized"]],
+                textposition="outside",
+                hovertemplate="%{y}<br>Share of Occupations: %{x:.2%}<extra></extra>"
             ))
             
             fig_tech.update_layout(
-                height=600,
+                height=max(400, 22 * len(top_tech)),
                 yaxis=dict(autorange="reversed", tickfont=dict(color="#e0e0e0")),
-                xaxis=dict(title="Adoption Level", tickfont=dict(color="#e0e0e0")),
+                xaxis=dict(title="Share of Occupations Using Technology", tickfont=dict(color="#e0e0e0")),
                 plot_bgcolor="rgba(15, 20, 25, 0.8)",
                 paper_bgcolor="rgba(26, 31, 46, 0.9)",
                 font=dict(color="#e0e0e0")
             )
             st.plotly_chart(fig_tech, use_container_width=True)
+            
+            if "commodity" in rankings:
+                st.subheader("Commodity Categories")
+                st.dataframe(rankings["commodity"], use_container_width=True)
+            if "hot" in rankings:
+                st.subheader("Hot vs. Other Technologies")
+                st.dataframe(rankings["hot"], use_container_width=True)
+            
+            st.divider()
+            st.subheader("Technology Detail")
+            tech_query = st.text_input("Find a technology:", "")
+            if tech_query:
+                matches = tech_df[tech_df["Technology"].str.contains(tech_query, case=False, regex=False)]["Technology"].head(50)
+                if not matches.empty:
+                    selected_tech = st.selectbox("Technology:", matches.tolist())
+                    st.dataframe(onet_loader.technology_detail(selected_tech), use_container_width=True)
+                else:
+                    st.info("No technology matches this search.")
         else:
             st.warning("⚠️ Technology data not available")
     
@@ -396,6 +538,8 @@ else:
             </div>
         """, unsafe_allow_html=True)
         
+        search_query = st.text_input("🔎 Search occupations (title words or SOC code prefix):", "")
+        
         filter_col1, filter_col2, filter_col3 = st.columns(3)
         
         with filter_col1:
@@ -416,13 +560,11 @@ else:
                 ["Automation Risk Score", "Routine Intensity", "Cognitive Complexity"]
             )
         
-        # Apply filters
-        filtered_df = risk_df[
-            (risk_df["Automation Risk Score"] >= min_risk) & 
-            (risk_df["Automation Risk Score"] <= max_risk)
-        ].copy()
-        
-        filtered_df = filtered_df.sort_values(sort_by, ascending=False)
+        # Apply filters (prefix-token lookup + binary-search range slice over presorted indexes)
+        filtered_df = onet_analysis.search_index(risk_weights).query(
+            search_query, risk_range=(min_risk, max_risk), sort_by=sort_by
+        )
+        st.caption(f"{len(filtered_df)} occupations")
         
         st.dataframe(
             filtered_df[["Occupation", "O*NET Code", "Automation Risk Score", 
@@ -431,6 +573,231 @@ else:
             use_container_width=True,
             height=600
         )
+    
+    # ==============================================================
+    # 6️⃣ TASK SEARCH
+    # ==============================================================
+    elif view_mode == "Task Search":
+        st.markdown("""
+            <div class="section-header">
+                <h2>🔎 Task Statement Search</h2>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        task_index = onet_loader.compute_task_index()
+        if task_index is None:
+            st.warning("⚠️ Task Statements data not available")
+        else:
+            search_col1, search_col2 = st.columns([3, 1])
+            with search_col1:
+                task_query = st.text_input("Describe the work:", "sorting parcels")
+            with search_col2:
+                top_k = st.slider("Results:", 5, 50, 10, 5)
+            
+            occupation_matches, task_matches = onet_loader.search_occupations_by_task(risk_df, task_query, k=top_k)
+            if not occupation_matches.empty:
+                st.subheader("Matching Occupations")
+                st.dataframe(occupation_matches, use_container_width=True)
+                st.subheader("Matching Task Statements")
+                st.dataframe(task_matches, use_container_width=True)
+            else:
+                st.info("No task statements match this query.")
+            
+            st.divider()
+            occupation_titles = risk_df.drop_duplicates("O*NET Code").set_index("O*NET Code")["Occupation"]
+            overlap_code = st.selectbox("Occupations with overlapping tasks for:", task_index.occupations.tolist(),
+                                        format_func=lambda code: f"{occupation_titles.get(code, code)} ({code})")
+            overlap_df = onet_loader.compute_task_overlap(risk_df, overlap_code, k=top_k)
+            if not overlap_df.empty:
+                st.dataframe(overlap_df, use_container_width=True)
+            else:
+                st.info("No overlapping occupations found.")
+    
+    # ==============================================================
+    # 7️⃣ RELEASE COMPARISON
+    # ==============================================================
+    elif view_mode == "Release Comparison":
+        st.markdown("""
+            <div class="section-header">
+                <h2>🆚 O*NET Release Comparison</h2>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        release_zips = list_release_zips()
+        if len(release_zips) < 2:
+            st.info("📌 Place two O*NET release archives (e.g. db_28_3_text.zip, db_29_0_text.zip) in the current directory to compare them.")
+        else:
+            release_col1, release_col2 = st.columns(2)
+            with release_col1:
+                baseline_zip = st.selectbox("Baseline Release:", release_zips, index=len(release_zips) - 2)
+            with release_col2:
+                current_zip = st.selectbox("Current Release:", release_zips, index=len(release_zips) - 1)
+            
+            if baseline_zip == current_zip:
+                st.warning("⚠️ Select two different releases")
+            else:
+                baseline_analysis = load_onet_analysis(baseline_zip)
+                current_analysis = load_onet_analysis(current_zip)
+                if baseline_analysis is None or current_analysis is None:
+                    st.error("❌ Could not load both releases")
+                else:
+                    release_diff = compare_onet_releases(baseline_analysis, current_analysis, risk_weights)
+                    records, report = release_diff["records"], release_diff["report"]
+                    
+                    diff_col1, diff_col2, diff_col3, diff_col4 = st.columns(4)
+                    with diff_col1:
+                        st.metric("🔁 Changed Records", int((records["Status"] == "changed").sum()))
+                    with diff_col2:
+                        st.metric("➕ Added Records", int((records["Status"] == "added").sum()))
+                    with diff_col3:
+                        st.metric("➖ Removed Records", int((records["Status"] == "removed").sum()))
+                    with diff_col4:
+                        st.metric("🧭 Occupations Touched", len(report))
+                    
+                    st.subheader("Occupations Ranked by Risk Change")
+                    st.dataframe(report, use_container_width=True, height=500)
+                    
+                    if not report.empty:
+                        diff_code = st.selectbox("Record changes for:", report["O*NET Code"].tolist())
+                        st.dataframe(records[records["O*NET Code"] == diff_code], use_container_width=True)
+    
+    # ==============================================================
+    # 8️⃣ OCCUPATION CLUSTERS
+    # ==============================================================
+    elif view_mode == "Occupation Clusters":
+        st.markdown("""
+            <div class="section-header">
+                <h2>🧩 Automation-Exposure Clusters</h2>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        cluster_col1, cluster_col2 = st.columns(2)
+        with cluster_col1:
+            n_clusters = st.slider("Number of Clusters:", 2, 20, 8)
+        with cluster_col2:
+            cluster_seed = st.number_input("Random Seed:", min_value=0, value=0, step=1)
+        
+        cluster_members, cluster_summary = onet_loader.compute_cluster_risk(risk_df, n_clusters, int(cluster_seed))
+        if not cluster_members.empty:
+            fig_clusters = go.Figure()
+            for cluster_id in cluster_summary["Cluster"]:
+                scores = cluster_members.loc[cluster_members["Cluster"] == cluster_id, "Automation Risk Score"]
+                fig_clusters.add_trace(go.Box(y=scores, name=f"Cluster {cluster_id}", boxmean=True))
+            fig_clusters.update_layout(
+                height=500,
+                showlegend=False,
+                yaxis=dict(title="Automation Risk Score", tickfont=dict(color="#e0e0e0")),
+                xaxis=dict(tickfont=dict(color="#e0e0e0")),
+                plot_bgcolor="rgba(15, 20, 25, 0.8)",
+                paper_bgcolor="rgba(26, 31, 46, 0.9)",
+                font=dict(color="#e0e0e0")
+            )
+            st.plotly_chart(fig_clusters, use_container_width=True)
+            st.dataframe(cluster_summary, use_container_width=True)
+            
+            selected_cluster = st.selectbox("Occupations in cluster:", cluster_summary["Cluster"].tolist())
+            st.dataframe(
+                cluster_members[cluster_members["Cluster"] == selected_cluster]
+                .sort_values("Automation Risk Score", ascending=False),
+                use_container_width=True
+            )
+        else:
+            st.info("Clusters are not available (requires Skills, Knowledge or Abilities data).")
+    
+    # ==============================================================
+    # 9️⃣ OCCUPATION LANDSCAPE
+    # ==============================================================
+    elif view_mode == "Occupation Landscape":
+        st.markdown("""
+            <div class="section-header">
+                <h2>🗺️ Occupation Landscape</h2>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        occupation_map = onet_loader.compute_occupation_map()
+        if occupation_map is not None:
+            map_df = occupation_map.to_frame().merge(
+                risk_df.drop_duplicates("O*NET Code")[["O*NET Code", "Occupation", "Automation Risk Score"]],
+                on="O*NET Code", how="inner"
+            )
+            fig_map = go.Figure(go.Scattergl(
+                x=map_df["PC1"],
+                y=map_df["PC2"],
+                mode="markers",
+                marker=dict(size=6, color=map_df["Automation Risk Score"], colorscale="RdYlGn_r",
+                            cmin=0, cmax=1, colorbar=dict(title="Risk")),
+                text=map_df["Occupation"],
+                hovertemplate="%{text}<br>Risk: %{marker.color:.3f}<extra></extra>"
+            ))
+            pc1, pc2 = occupation_map.explained
+            fig_map.update_layout(
+                height=650,
+                xaxis=dict(title=f"PC1 ({pc1:.1%} of variance)", tickfont=dict(color="#e0e0e0")),
+                yaxis=dict(title=f"PC2 ({pc2:.1%} of variance)", tickfont=dict(color="#e0e0e0")),
+                plot_bgcolor="rgba(15, 20, 25, 0.8)",
+                paper_bgcolor="rgba(26, 31, 46, 0.9)",
+                font=dict(color="#e0e0e0")
+            )
+            st.plotly_chart(fig_map, use_container_width=True)
+            st.caption("Occupations close together have similar skill, knowledge and ability profiles.")
+        else:
+            st.info("The occupation landscape requires Skills, Knowledge or Abilities data.")
+    
+    # ==============================================================
+    # 🔟 COUNTRY EXPOSURE
+    # ==============================================================
+    elif view_mode == "Country Exposure":
+        st.markdown("""
+            <div class="section-header">
+                <h2>🌍 Country Exposure (SOC → ISCO-08)</h2>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        exposure_df = onet_analysis.country_exposure(risk_weights)
+        if exposure_df.empty:
+            st.info("📌 Requires a SOC↔ISCO-08 crosswalk file (e.g. ISCO_SOC_Crosswalk.xls) and an ILOSTAT "
+                    "employment by occupation (ISCO-08) file in the current directory.")
+        else:
+            exposure_metric = st.selectbox("Exposure Metric:", [c for c in exposure_df.columns
+                                                                if c not in ("Area", "Year", "Coverage")])
+            exposure_years = sorted(exposure_df["Year"].unique())
+            exposure_year = st.select_slider("Year:", exposure_years, value=exposure_years[-1])
+            
+            year_df = exposure_df[exposure_df["Year"] == exposure_year].sort_values(exposure_metric, ascending=False)
+            top_countries = year_df.head(25)
+            fig_exposure = go.Figure(go.Bar(
+                x=top_countries[exposure_metric],
+                y=top_countries["Area"],
+                orientation="h",
+                marker=dict(color=top_countries[exposure_metric], colorscale="Reds",
+                            line=dict(width=1, color="#ffffff")),
+                customdata=top_countries["Coverage"],
+                hovertemplate="%{y}<br>%{x:.3f}<br>Employment Coverage: %{customdata:.0%}<extra></extra>"
+            ))
+            fig_exposure.update_layout(
+                height=650,
+                yaxis=dict(autorange="reversed", tickfont=dict(color="#e0e0e0")),
+                xaxis=dict(title=f"Employment-Weighted {exposure_metric}", tickfont=dict(color="#e0e0e0")),
+                plot_bgcolor="rgba(15, 20, 25, 0.8)",
+                paper_bgcolor="rgba(26, 31, 46, 0.9)",
+                font=dict(color="#e0e0e0")
+            )
+            st.plotly_chart(fig_exposure, use_container_width=True)
+            
+            exposure_countries = st.multiselect("Compare countries over time:", sorted(exposure_df["Area"].unique()),
+                                                default=top_countries["Area"].head(3).tolist())
+            if exposure_countries:
+                fig_trend = px.line(exposure_df[exposure_df["Area"].isin(exposure_countries)],
+                                    x="Year", y=exposure_metric, color="Area", markers=True)
+                fig_trend.update_layout(
+                    plot_bgcolor="rgba(15, 20, 25, 0.8)",
+                    paper_bgcolor="rgba(26, 31, 46, 0.9)",
+                    font=dict(color="#e0e0e0")
+                )
+                st.plotly_chart(fig_trend, use_container_width=True)
+            
+            st.download_button("📥 Download Country Exposure (CSV)", exposure_df.to_csv(index=False),
+                               file_name="onet_country_exposure.csv", mime="text/csv")
 
 # ==============================================================
 # Footer
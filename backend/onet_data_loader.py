@@ -1,30 +1,361 @@
 # onet_data_loader.py
 import os
+import io
+import csv
+import time
+import pickle
+import hashlib
+import zipfile
+import logging
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import streamlit as st
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+from onet_model import (RISK_COMPONENTS, OccupationClusters, OccupationElementMatrices, OccupationMap,
+                        OccupationSimilarity, RiskComponents, SocIscoCrosswalk, TransitionGraph,
+                        compute_task_content_measures, country_exposure, diff_release_records, release_records,
+                        soc_rollups)
+from onet_text import OccupationSearchIndex, TaskPhraseMatcher, TaskRatingProfiles, TaskTextIndex
+
+# Parsed O*NET workbooks are cached here as uncompressed Arrow (Feather) files,
+# keyed by source file fingerprint, so each .xlsx is parsed only once
+ONET_CACHE_DIR = ".onet_cache"
+
+logger = logging.getLogger(__name__)
+
+
+def _file_fingerprint(path: str) -> str:
+    """Fingerprint of a source file from its absolute path, size and modification time"""
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _columnar_cache_path(path: str, fingerprint: str) -> str:
+    """Cache file for a source file: <stem>-<fingerprint>.feather"""
+    stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    return os.path.join(ONET_CACHE_DIR, f"{stem}-{fingerprint}.feather")
+
+
+def _read_columnar_cache(cache_path: str) -> Optional[pd.DataFrame]:
+    """Load a cached table into pandas; None if missing, unreadable or pyarrow is unavailable"""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        import pyarrow.feather as feather
+        return feather.read_table(cache_path).to_pandas()
+    except Exception:
+        return None
+
+
+def _write_columnar_cache(df: pd.DataFrame, cache_path: str) -> None:
+    """Store a parsed table as uncompressed Feather and drop stale versions (best effort)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        return
+    try:
+        os.makedirs(ONET_CACHE_DIR, exist_ok=True)
+        stem = os.path.basename(cache_path).rsplit("-", 1)[0]
+        for old in os.listdir(ONET_CACHE_DIR):
+            if old.rsplit("-", 1)[0] == stem and old.endswith(".feather"):
+                os.remove(os.path.join(ONET_CACHE_DIR, old))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = cache_path + ".tmp"
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.debug("Could not cache %s: %s", cache_path, e)
+
+
+# Derived O*NET artifacts (feature matrices, similarity tables, indexes, ...) memoized per
+# data version. Module-level so they survive Streamlit reruns; only the most recent
+# versions are kept. Streamlit serves each session from its own thread, so the cache is
+# guarded by _CACHE_LOCK and each key is built under its own lock: concurrent first
+# accesses wait for one build instead of repeating it, and unrelated artifacts
+# (including ones built from inside another build) still build independently.
+# Artifacts keyed by risk weights get a new entry per slider position, so they are
+# additionally capped per (version, name) to the most recently used entries.
+_ARTIFACT_CACHE: Dict[Tuple, object] = {}
+_BUILD_LOCKS: Dict[Tuple, threading.Lock] = {}
+_CACHE_LOCK = threading.Lock()
+_MAX_CACHED_VERSIONS = 3
+_MAX_WEIGHTED_ENTRIES = 8
+
+
+def _memoize(version: Optional[str], name: str, build: Callable[[], object], *params,
+             max_entries: Optional[int] = None) -> object:
+    """
+    Return the cached artifact for (version, name, params), building it on first access.
+    max_entries caps the number of params variants kept for (version, name),
+    evicting the least recently used.
+    """
+    if version is None:
+        return build()
+    key = (version, name) + params
+    with _CACHE_LOCK:
+        if key in _ARTIFACT_CACHE:
+            if max_entries is not None:
+                _ARTIFACT_CACHE[key] = _ARTIFACT_CACHE.pop(key)  # mark as most recently used
+            return _ARTIFACT_CACHE[key]
+        build_lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+    
+    with build_lock:
+        with _CACHE_LOCK:
+            if key in _ARTIFACT_CACHE:
+                return _ARTIFACT_CACHE[key]
+        value = build()
+        with _CACHE_LOCK:
+            versions = list(dict.fromkeys(k[0] for k in _ARTIFACT_CACHE))
+            if version not in versions and len(versions) >= _MAX_CACHED_VERSIONS:
+                for old in [k for k in _ARTIFACT_CACHE if k[0] == versions[0]]:
+                    del _ARTIFACT_CACHE[old]
+                    _BUILD_LOCKS.pop(old, None)
+            if max_entries is not None:
+                variants = [k for k in _ARTIFACT_CACHE if k[:2] == (version, name)]
+                for old in variants[:max(0, len(variants) - max_entries + 1)]:
+                    del _ARTIFACT_CACHE[old]
+            _ARTIFACT_CACHE[key] = value
+            _BUILD_LOCKS.pop(key, None)
+    return value
+
+
+def _is_cached_or_building(version: Optional[str], name: str, *params) -> bool:
+    """Whether (version, name, params) is cached or being built (checked under _CACHE_LOCK)"""
+    if version is None:
+        return False
+    key = (version, name) + params
+    with _CACHE_LOCK:
+        return key in _ARTIFACT_CACHE or key in _BUILD_LOCKS
+
+
+# Official O*NET file names (without extension) per loader attribute
+ONET_FILE_NAMES = {
+    "occupations_df": "Occupation Data",
+    "task_statements_df": "Task Statements",
+    "skills_df": "Skills",
+    "knowledge_df": "Knowledge",
+    "abilities_df": "Abilities",
+    "technology_df": "Technology Skills",
+    "work_activities_df": "Work Activities",
+    "work_context_df": "Work Context",
+}
+
+# Task Ratings (~160k rows) are streamed in chunks into compact per-occupation arrays
+# instead of being held as a DataFrame
+TASK_RATINGS_FILE_NAME = "Task Ratings"
+TASK_RATINGS_COLUMNS = ["O*NET-SOC Code", "Task ID", "Scale ID", "Category", "Data Value"]
+TASK_RATINGS_CHUNK_ROWS = 50_000
+
+# Explicit dtypes for the tab-delimited release files (columns absent from a file are ignored)
+ONET_TEXT_DTYPES = {
+    "O*NET-SOC Code": str,
+    "Title": "category",
+    "Description": str,
+    "Element ID": "category",
+    "Element Name": "category",
+    "Scale ID": "category",
+    "Scale Name": "category",
+    "Category": "float64",
+    "Data Value": "float64",
+    "N": "float64",
+    "Standard Error": "float64",
+    "Lower CI Bound": "float64",
+    "Upper CI Bound": "float64",
+    "Recommend Suppress": "category",
+    "Not Relevant": "category",
+    "Date": "category",
+    "Domain Source": "category",
+    "Task ID": "float64",
+    "Task": str,
+    "Task Type": "category",
+    "Incumbents Responding": "float64",
+    "Example": str,
+    "Commodity Code": "float64",
+    "Commodity Title": "category",
+    "Hot Technology": "category",
+    "In Demand": "category",
+}
+
+
+def _read_onet_text(handle, header: List[str]) -> pd.DataFrame:
+    """Parse one tab-delimited O*NET text file with the C parser and explicit dtypes"""
+    dtypes = {col: ONET_TEXT_DTYPES[col] for col in header if col in ONET_TEXT_DTYPES}
+    return pd.read_csv(handle, sep="\t", dtype=dtypes, engine="c", encoding="utf-8", quoting=csv.QUOTE_NONE)
+
+
+# Cold workbook parsing (pd.read_excel is GIL-bound) is spread over a process pool
+# once at least this many uncached workbooks are needed together
+PARALLEL_PARSE_MIN_FILES = 2
+
+
+def _parse_workbook(path: str) -> Tuple[str, Optional[bytes], Optional[str], float, Optional[str]]:
+    """
+    Process-pool worker: parse one Excel workbook and serialize it compactly for the parent
+    (Arrow IPC / Feather bytes, or pickle protocol 5 if pyarrow is unavailable).
+    Returns (path, payload, payload format, seconds, error message).
+    """
+    start = time.perf_counter()
+    try:
+        df = pd.read_excel(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            sink = pa.BufferOutputStream()
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), sink, compression="uncompressed")
+            payload, fmt = sink.getvalue().to_pybytes(), "feather"
+        except ImportError:
+            payload, fmt = pickle.dumps(df, protocol=5), "pickle"
+        return path, payload, fmt, time.perf_counter() - start, None
+    except Exception as e:
+        return path, None, None, time.perf_counter() - start, str(e)
+
+
+def _decode_workbook(payload: bytes, fmt: str) -> pd.DataFrame:
+    """Inverse of the _parse_workbook serialization"""
+    if fmt == "feather":
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        return feather.read_table(pa.BufferReader(payload)).to_pandas()
+    return pickle.loads(payload)
+
+
+def _find_isco_files(files_in_dir: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Locate the SOC↔ISCO-08 crosswalk and the ILOSTAT employment-by-occupation (ISCO-08) file
+    in a directory listing. Returns (crosswalk_file, employment_file).
+    """
+    files_in_dir = os.listdir(".") if files_in_dir is None else files_in_dir
+    tables = [f for f in files_in_dir if f.lower().endswith(('.csv', '.xlsx', '.xls'))]
+    crosswalk = next((f for f in tables if "isco" in f.lower() and ("soc" in f.lower() or "crosswalk" in f.lower())), None)
+    employment = next((f for f in tables if "employment" in f.lower() and ("isco" in f.lower() or "occupation" in f.lower())
+                       and f != crosswalk), None)
+    return crosswalk, employment
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    """Read a CSV or Excel table (Excel through the columnar cache)"""
+    if path.lower().endswith(('.xlsx', '.xls')):
+        cache_path = _columnar_cache_path(path, _file_fingerprint(path))
+        df = _read_columnar_cache(cache_path)
+        if df is None:
+            df = pd.read_excel(path)
+            _write_columnar_cache(df, cache_path)
+        return df
+    return pd.read_csv(path, low_memory=False)
+
+
+def load_isco_employment(path: str) -> pd.DataFrame:
+    """
+    ILOSTAT employment by occupation (ISCO-08) as a long frame: Area, Year, ISCO, Employment.
+    
+    Occupation codes are parsed from classification codes (OCU_ISCO08_1) or labels
+    ("Occupation (ISCO-08): 1. Managers"); totals / not-elsewhere-classified rows are
+    dropped, sex breakdowns are reduced to the total, and only the most common ISCO
+    digit level is kept.
+    """
+    df = _read_table(path)
+    lower = {c: str(c).lower() for c in df.columns}
+    area_col = next((c for c, l in lower.items() if l in ("area", "ref_area.label", "country", "ref_area")), None)
+    year_col = next((c for c, l in lower.items() if l in ("year", "time")), None)
+    value_col = next((c for c, l in lower.items() if l in ("obs_value", "total", "value")), None)
+    class_col = next((c for c, l in lower.items() if "classif1" in l or "occupation" in l), None)
+    if not all([area_col, year_col, value_col, class_col]):
+        st.warning(f"Could not find Area / Year / occupation / value columns in {path}")
+        return pd.DataFrame()
+    
+    sex_col = next((c for c, l in lower.items() if l.startswith("sex")), None)
+    if sex_col is not None:
+        sex = df[sex_col].astype(str).str.lower()
+        df = df[sex.str.contains("total") | sex.str.endswith("_t")]
+    
+    labels = df[class_col].astype(str)
+    codes = labels.str.extract(r"ISCO08_(\d{1,4})$", expand=False) \
+        .fillna(labels.str.extract(r"(?:^|:\s*)(\d{1,4})(?:\.|\s|$)", expand=False))
+    employment = pd.DataFrame({
+        "Area": df[area_col].astype(str).str.strip(),
+        "Year": pd.to_numeric(df[year_col], errors="coerce"),
+        "ISCO": codes,
+        "Employment": pd.to_numeric(df[value_col], errors="coerce"),
+    }).dropna()
+    if employment.empty:
+        return employment
+    employment["Year"] = employment["Year"].astype(int)
+    digits = employment["ISCO"].str.len()
+    employment = employment[digits == digits.mode().iloc[0]]
+    return employment.groupby(["Area", "Year", "ISCO"], as_index=False)["Employment"].sum()
+
+
+def list_release_zips(files_in_dir: Optional[List[str]] = None) -> List[str]:
+    """O*NET database release zips in a directory listing (e.g. db_29_0_text.zip), sorted by name"""
+    files_in_dir = os.listdir(".") if files_in_dir is None else files_in_dir
+    return sorted(f for f in files_in_dir if f.lower().endswith(".zip") and ("db_" in f.lower() or "onet" in f.lower()))
+
+
+class _LazyTable:
+    """Loader attribute parsed from its registered source on first access"""
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if self.name not in obj._tables:
+            obj._tables[self.name] = obj._load_source(self.name)
+        return obj._tables[self.name]
+    
+    def __set__(self, obj, value):
+        obj._tables[self.name] = value
+
 
 class ONETDataLoader:
     """
     O*NET Database Loader and Processor
     Loads occupation data from O*NET Excel files and computes automation risk metrics
+    
+    load_onet_files only discovers the source files and fingerprints them; each
+    table is parsed the first time it is accessed and memoized per data version.
     """
     
-    def __init__(self):
-        self.occupations_df = None
-        self.task_statements_df = None
-        self.skills_df = None
-        self.knowledge_df = None
-        self.abilities_df = None
-        self.technology_df = None
+    occupations_df = _LazyTable()
+    task_statements_df = _LazyTable()
+    skills_df = _LazyTable()
+    knowledge_df = _LazyTable()
+    abilities_df = _LazyTable()
+    technology_df = _LazyTable()
+    work_activities_df = _LazyTable()
+    work_context_df = _LazyTable()
+    task_ratings = _LazyTable()
+    
+    def __init__(self, release_zip: Optional[str] = None):
+        self.release_zip = release_zip
+        self._tables = {}
+        self._sources: Dict[str, Tuple[str, Callable[[], object]]] = {}
+        self._workbooks: Dict[str, str] = {}
+        self.file_fingerprints = {}
+        self.data_version = None
         
+    def _read_excel_cached(self, path: str) -> pd.DataFrame:
+        """Read an Excel workbook through the columnar cache (parse once per file version)"""
+        cache_path = _columnar_cache_path(path, _file_fingerprint(path))
+        df = _read_columnar_cache(cache_path)
+        if df is not None:
+            return df
+        df = pd.read_excel(path)
+        _write_columnar_cache(df, cache_path)
+        return df
+    
     def _read_csv_safe(self, path: str) -> pd.DataFrame:
         """Safely read CSV or Excel with error handling"""
         try:
-            # Handle Excel files
+            # Handle Excel files (parsed once, then read back from the columnar cache)
             if path.endswith('.xlsx') or path.endswith('.xls'):
-                df = pd.read_excel(path)
+                df = self._read_excel_cached(path)
                 return df
             # Handle CSV files
             else:
@@ -49,11 +380,148 @@ class ONETDataLoader:
                 return fname
         return None
     
+    def _find_release_zip(self, files_in_dir: List[str]) -> str:
+        """Find an O*NET database release zip (e.g. db_29_0_text.zip)"""
+        zips = list_release_zips(files_in_dir)
+        # prefer the tab-delimited text distribution
+        zips.sort(key=lambda f: "text" not in f.lower())
+        return zips[0] if zips else None
+    
+    def _register_source(self, attr_name: str, label: str, fingerprint: str, read: Callable[[], object]) -> None:
+        """Record where a table comes from; it is parsed on first access"""
+        self._sources[attr_name] = (label, read)
+        self.file_fingerprints[attr_name] = fingerprint
+    
+    def _load_source(self, attr_name: str):
+        """Parse a registered source (memoized per data version, so reruns reuse it)"""
+        if attr_name not in self._sources:
+            return None
+        label, read = self._sources[attr_name]
+        
+        def build():
+            try:
+                table = read()
+            except Exception as e:
+                st.warning(f"Could not read {label}: {e}")
+                return None
+            if table is None or (isinstance(table, pd.DataFrame) and table.empty):
+                st.warning(f"⚠️ File {label} was empty")
+                return None
+            if isinstance(table, pd.DataFrame):
+                st.success(f"✅ Loaded: {label} ({len(table)} rows, {len(table.columns)} cols)", icon="📈")
+            else:
+                st.success(f"✅ Loaded: {label} ({table!r})", icon="📈")
+            return table
+        
+        return _memoize(self.data_version, "table", build, attr_name)
+    
+    def prefetch(self, attr_names: List[str]) -> None:
+        """
+        Parse the uncached Excel workbooks behind several tables in parallel worker
+        processes, so a cold load costs about the slowest file instead of the sum.
+        Results are written to the columnar cache and memoized like lazily parsed
+        tables; per-file timing and errors are reported.
+        """
+        pending = {}
+        for attr_name in attr_names:
+            path = self._workbooks.get(attr_name)
+            if path is None or attr_name in self._tables or _is_cached_or_building(self.data_version, "table", attr_name):
+                continue
+            if os.path.exists(_columnar_cache_path(path, _file_fingerprint(path))):
+                continue
+            pending[path] = attr_name
+        if len(pending) < PARALLEL_PARSE_MIN_FILES:
+            return
+        
+        st.info(f"⚡ Parsing {len(pending)} workbooks in parallel...", icon="⚙️")
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+                results = list(pool.map(_parse_workbook, list(pending)))
+        except Exception as e:
+            st.warning(f"Parallel parsing unavailable, falling back to sequential loading: {e}")
+            return
+        
+        file_seconds = 0.0
+        for path, payload, fmt, seconds, error in results:
+            file_seconds += seconds
+            if error is not None:
+                st.warning(f"Error reading {path}: {error} ({seconds:.1f}s)")
+                continue
+            df = _decode_workbook(payload, fmt)
+            _write_columnar_cache(df, _columnar_cache_path(path, _file_fingerprint(path)))
+            if df.empty:
+                continue  # reported as empty on first access
+            _memoize(self.data_version, "table", lambda df=df: df, pending[path])
+            st.success(f"✅ Loaded: {path} ({len(df)} rows, {len(df.columns)} cols) in {seconds:.1f}s", icon="📈")
+        st.info(f"⏱️ Parallel parse: {time.perf_counter() - start:.1f}s wall vs {file_seconds:.1f}s of per-file work")
+    
+    def _register_onet_zip(self, zip_path: str) -> int:
+        """
+        Register the needed members of an O*NET release zip. Members are streamed
+        through the C CSV parser on first access (no extraction to disk).
+        Returns the number of files found.
+        """
+        zip_fingerprint = _file_fingerprint(zip_path)
+        files_found = 0
+        try:
+            with zipfile.ZipFile(zip_path) as zf:
+                members = {
+                    os.path.splitext(os.path.basename(name))[0].lower(): name
+                    for name in zf.namelist()
+                    if name.lower().endswith((".txt", ".csv"))
+                }
+        except zipfile.BadZipFile as e:
+            st.error(f"❌ {zip_path} is not a valid zip file: {e}")
+            return 0
+        
+        def read_member(member):
+            with zipfile.ZipFile(zip_path) as zf:
+                with zf.open(member) as raw:
+                    handle = io.TextIOWrapper(raw, encoding="utf-8")
+                    header = handle.readline().rstrip("\r\n").split("\t")
+                with zf.open(member) as raw:
+                    return _read_onet_text(raw, header)
+        
+        def read_task_ratings(member):
+            with zipfile.ZipFile(zip_path) as zf:
+                with zf.open(member) as raw:
+                    chunks = pd.read_csv(
+                        raw, sep="\t", encoding="utf-8", quoting=csv.QUOTE_NONE,
+                        usecols=lambda col: col in TASK_RATINGS_COLUMNS,
+                        dtype={"O*NET-SOC Code": str, "Scale ID": str},
+                        chunksize=TASK_RATINGS_CHUNK_ROWS,
+                    )
+                    return TaskRatingProfiles.from_chunks(chunks)
+        
+        for attr_name, file_name in ONET_FILE_NAMES.items():
+            member = members.get(file_name.lower())
+            if member is None:
+                st.info(f"⏭️ Skipping '{attr_name}' - {file_name} not in {zip_path} (optional)")
+                continue
+            self._register_source(attr_name, member, f"{zip_fingerprint}:{member}",
+                                  lambda member=member: read_member(member))
+            files_found += 1
+        
+        member = members.get(TASK_RATINGS_FILE_NAME.lower())
+        if member is not None:
+            self._register_source("task_ratings", member, f"{zip_fingerprint}:{member}",
+                                  lambda: read_task_ratings(member))
+            files_found += 1
+        return files_found
+    
     def load_onet_files(self) -> bool:
         """
-        Load all O*NET files (CSV or Excel) from current directory
+        Discover all O*NET files in the current directory: an O*NET release zip
+        (tab-delimited text, read in place) if present, else loose CSV or Excel files.
+        Files are fingerprinted here and parsed lazily on first access.
         """
-        st.info("🔍 Searching for O*NET files (CSV or Excel)...", icon="📊")
+        st.info("🔍 Searching for O*NET files (release zip, CSV or Excel)...", icon="📊")
+        
+        release_zip = self.release_zip or self._find_release_zip(os.listdir("."))
+        if release_zip:
+            st.info(f"Reading O*NET release archive {release_zip}", icon="🗜️")
+            return self._finish_load(self._register_onet_zip(release_zip))
         
         cwd_files = [f for f in os.listdir(".") if f.endswith(('.csv', '.xlsx', '.xls'))]
         
@@ -61,7 +529,10 @@ class ONETDataLoader:
             st.error("❌ No CSV or Excel files found in current directory")
             return False
         
-        st.info(f"Found {len(cwd_files)} files", icon="📂")
+        # Task Ratings is streamed separately (and must not be mistaken for Task Statements)
+        ratings_file = next((f for f in cwd_files if "task rating" in f.lower().replace("_", " ")), None)
+        if ratings_file:
+            cwd_files.remove(ratings_file)
         
         # Define expected files with flexible matching
         file_patterns = {
@@ -70,47 +541,89 @@ class ONETDataLoader:
             "skills_df": ["skills"],
             "knowledge_df": ["knowledge"],
             "abilities_df": ["abilities"],
-            "technology_df": ["technolog"]
+            "technology_df": ["technolog"],
+            "work_activities_df": ["work activities", "work_activities"],
+            "work_context_df": ["work context", "work_context"]
         }
         
-        files_loaded = 0
+        files_found = 0
         for attr_name, patterns in file_patterns.items():
-            found_file = None
-            for pattern in patterns:
+            # exact official name first ("Skills" must not pick up "Technology Skills")
+            found_file = next(
+                (f for f in cwd_files if os.path.splitext(f)[0].lower() == ONET_FILE_NAMES[attr_name].lower()),
+                None
+            )
+            for pattern in ([] if found_file else patterns):
                 found_file = self._find_file_by_pattern(pattern, cwd_files)
                 if found_file:
                     break
             
             if found_file:
-                df = self._read_csv_safe(found_file)
-                if not df.empty:
-                    setattr(self, attr_name, df)
-                    st.success(f"✅ Loaded: {found_file} ({len(df)} rows, {len(df.columns)} cols)", icon="📈")
-                    files_loaded += 1
+                self._register_source(attr_name, found_file, _file_fingerprint(found_file),
+                                      lambda path=found_file: self._read_csv_safe(path))
+                if found_file.endswith(('.xlsx', '.xls')):
+                    self._workbooks[attr_name] = found_file
+                files_found += 1
+        
+        if ratings_file:
+            def read_task_ratings():
+                if ratings_file.endswith('.csv'):
+                    chunks = pd.read_csv(ratings_file, usecols=lambda col: col in TASK_RATINGS_COLUMNS,
+                                         dtype={"O*NET-SOC Code": str, "Scale ID": str},
+                                         chunksize=TASK_RATINGS_CHUNK_ROWS)
                 else:
-                    st.warning(f"⚠️ File {found_file} was empty")
-            else:
-                st.info(f"⏭️ Skipping '{attr_name}' - file not found (optional)")
+                    chunks = [self._read_csv_safe(ratings_file)]
+                return TaskRatingProfiles.from_chunks(chunks)
+            
+            self._register_source("task_ratings", ratings_file, _file_fingerprint(ratings_file), read_task_ratings)
+            files_found += 1
         
-        if files_loaded == 0:
-            st.error("❌ No valid O*NET files loaded")
+        return self._finish_load(files_found)
+    
+    def _finish_load(self, files_found: int) -> bool:
+        """Report the discovery result and record the data version"""
+        if files_found == 0:
+            st.error("❌ No valid O*NET files found")
             return False
         
-        st.success(f"✅ O*NET Loader: {files_loaded} files loaded successfully", icon="🎯")
+        # Version of the loaded O*NET data (changes whenever any source file changes)
+        version_key = "|".join(f"{k}={v}" for k, v in sorted(self.file_fingerprints.items()))
+        self.data_version = hashlib.sha1(version_key.encode("utf-8")).hexdigest()[:16]
+        
+        st.success(f"✅ O*NET Loader: {files_found} files found (parsed on demand)", icon="🎯")
         return True
     
-    def compute_automation_risk_score(self) -> pd.DataFrame:
+    def compute_automation_risk_score(self, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
         """
         Compute automation risk score based on O*NET occupational data
         Uses task and skill data to assess automation vulnerability
+        
+        weights: per-component risk weights (defaults: DEFAULT_RISK_WEIGHTS). Only the
+        weighting is recomputed; the components are cached per data version.
         """
+        components = self.compute_risk_components()
+        if components is None:
+            return pd.DataFrame()
+        
+        automation_risk = components.score(weights)
+        risk_df = components.to_frame()
+        risk_df["Automation Risk Score"] = automation_risk
+        risk_df["Risk Level"] = self._categorize_risk_array(automation_risk)
+        return risk_df
+    
+    def compute_risk_components(self) -> Optional[RiskComponents]:
+        """Routine, manual, cognitive and interpersonal components, built once per data version"""
+        return _memoize(self.data_version, "risk_components", self._build_risk_components)
+    
+    def _build_risk_components(self) -> Optional[RiskComponents]:
+        """Derive the four 0–1 risk components per occupation from the loaded tables"""
+        self.prefetch(["occupations_df", "task_statements_df", "work_activities_df", "work_context_df"])
         if self.occupations_df is None or self.occupations_df.empty:
             st.error("❌ Occupations data not loaded")
-            return pd.DataFrame()
+            return None
         
-        st.info("🧮 Computing automation risk scores from O*NET data...", icon="⚙️")
+        st.info("🧮 Computing automation risk components from O*NET data...", icon="⚙️")
         
-        risk_data = []
         occupations_df = self.occupations_df.copy()
         
         # Display comprehensive debugging information
@@ -154,81 +667,297 @@ class ONETDataLoader:
         st.success(f"✅ Using Code Column: **{occ_code_col}** | Title Column: **{occ_title_col}**")
         
         try:
-            for idx, row in occupations_df.iterrows():
-                occ_code = str(row.get(occ_code_col, f"OCC_{idx}")).strip()
-                occ_title = str(row.get(occ_title_col, f"Occupation {idx}")).strip()
-                
-                # Get all numeric columns and values
-                numeric_values = []
-                
-                if numeric_cols:
-                    # Use actual numeric columns
-                    for col in numeric_cols:
-                        try:
-                            val = float(row.get(col, 0.5))
-                            numeric_values.append(val)
-                        except:
-                            pass
-                else:
-                    # Try to convert string columns to numeric
-                    for col in occupations_df.columns[2:]:  # Skip first 2 (code, title)
-                        try:
-                            val = float(str(row.get(col, "0.5")).replace(",", ""))
-                            numeric_values.append(val)
-                        except:
-                            pass
-                
-                # Extract or compute components
-                if len(numeric_values) >= 4:
-                    routine_intensity = self._normalize_value(numeric_values[0])
-                    manual_intensity = self._normalize_value(numeric_values[1])
-                    cognitive_complexity = self._normalize_value(numeric_values[2])
-                    human_interaction = self._normalize_value(numeric_values[3])
-                elif len(numeric_values) > 0:
-                    # Distribute available values
-                    routine_intensity = self._normalize_value(numeric_values[0])
-                    manual_intensity = self._normalize_value(numeric_values[0])
-                    cognitive_complexity = self._normalize_value(numeric_values[-1]) if len(numeric_values) > 1 else 0.5
-                    human_interaction = self._normalize_value(numeric_values[-1]) if len(numeric_values) > 1 else 0.5
+            occ_codes = occupations_df[occ_code_col].astype(str).str.strip()
+            occ_titles = occupations_df[occ_title_col].astype(str).str.strip()
+
+            # Coerce the component columns once
+            if numeric_cols:
+                component_values = occupations_df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+            else:
+                # Try to convert string columns to numeric (skip first 2: code, title)
+                converted = occupations_df[occupations_df.columns[2:]].apply(
+                    lambda col: pd.to_numeric(col.astype(str).str.replace(",", ""), errors="coerce")
+                )
+                component_values = converted.loc[:, converted.notna().any()]
+
+            components = self._normalize_array(component_values.to_numpy(dtype=float, na_value=np.nan))
+            n_occ, n_components = components.shape
+            
+            # Extract or compute components
+            if n_components >= 4:
+                routine_intensity = components[:, 0]
+                manual_intensity = components[:, 1]
+                cognitive_complexity = components[:, 2]
+                human_interaction = components[:, 3]
+            elif n_components > 0:
+                # Distribute available values
+                routine_intensity = components[:, 0]
+                manual_intensity = components[:, 0]
+                cognitive_complexity = components[:, -1] if n_components > 1 else np.full(n_occ, 0.5)
+                human_interaction = components[:, -1] if n_components > 1 else np.full(n_occ, 0.5)
+            else:
+                routine_intensity = manual_intensity = np.full(n_occ, 0.5)
+                cognitive_complexity = human_interaction = np.full(n_occ, 0.5)
+            
+            # Task-content signals, each mapped to 0–1 as percentile ranks across occupations:
+            # (importance-weighted) phrase shares from Task Statements and the standard
+            # Work Activities / Work Context measures. Where an occupation has both, the
+            # component is their average; where it has neither, the fallback above is kept.
+            signals = {name: [] for name in RISK_COMPONENTS}
+            
+            task_shares = self.compute_task_content_shares()
+            if task_shares is not None and not task_shares.empty:
+                share_ranks = task_shares.rank(pct=True).reindex(occ_codes.to_numpy())
+                signals["Routine Intensity"].append(share_ranks["Routine Share"].to_numpy(dtype=float))
+                signals["Manual Intensity"].append(share_ranks["Manual Share"].to_numpy(dtype=float))
+                signals["Human Interaction"].append(share_ranks["Interpersonal Share"].to_numpy(dtype=float))
+                has_tasks = int(share_ranks["Task Count"].notna().sum())
+                if "Rated Task Count" in task_shares:
+                    rated = int((task_shares["Rated Task Count"].reindex(occ_codes.to_numpy()) > 0).sum())
+                    st.info(f"📝 Task-content shares from Task Statements used for {has_tasks} occupations "
+                            f"({rated} weighted by Task Ratings importance)")
                 else:
-                    routine_intensity = 0.5
-                    manual_intensity = 0.5
-                    cognitive_complexity = 0.5
-                    human_interaction = 0.5
-                
-                # Compute automation risk
-                automation_risk = (routine_intensity + manual_intensity) * 0.4 + \
-                                 (1 - cognitive_complexity) * 0.3 + \
-                                 (1 - human_interaction) * 0.3
-                automation_risk = np.clip(automation_risk, 0, 1)
-                
-                risk_data.append({
-                    "O*NET Code": occ_code,
-                    "Occupation": occ_title,
-                    "Routine Intensity": routine_intensity,
-                    "Manual Intensity": manual_intensity,
-                    "Cognitive Complexity": cognitive_complexity,
-                    "Human Interaction": human_interaction,
-                    "Automation Risk Score": automation_risk,
-                    "Risk Level": self._categorize_risk(automation_risk)
-                })
+                    st.info(f"📝 Task-content shares from Task Statements used for {has_tasks} occupations")
+            
+            task_measures = self.compute_task_content_measures()
+            if task_measures is not None and not task_measures.empty:
+                percentiles = task_measures.rank(pct=True).reindex(occ_codes.to_numpy())
+                signals["Routine Intensity"].append(percentiles["Routine Cognitive"].to_numpy(dtype=float))
+                signals["Manual Intensity"].append(percentiles["Routine Manual"].to_numpy(dtype=float))
+                signals["Cognitive Complexity"].append(percentiles["Non-Routine Analytic"].to_numpy(dtype=float))
+                signals["Human Interaction"].append(percentiles["Interpersonal"].to_numpy(dtype=float))
+                st.info(f"🧩 Work Activities / Work Context measures used for "
+                        f"{int(percentiles.notna().any(axis=1).sum())} occupations")
+            
+            def blend(name, fallback):
+                if not signals[name]:
+                    return fallback
+                stacked = np.column_stack(signals[name])
+                available = (~np.isnan(stacked)).sum(axis=1)
+                mean = np.nansum(stacked, axis=1) / np.maximum(available, 1)
+                return np.where(available > 0, mean, fallback)
+            
+            routine_intensity = blend("Routine Intensity", routine_intensity)
+            manual_intensity = blend("Manual Intensity", manual_intensity)
+            cognitive_complexity = blend("Cognitive Complexity", cognitive_complexity)
+            human_interaction = blend("Human Interaction", human_interaction)
+            
+            components = RiskComponents(
+                occ_codes.to_numpy(),
+                occ_titles.to_numpy(),
+                np.column_stack([routine_intensity, manual_intensity, cognitive_complexity, human_interaction]),
+            )
         
         except Exception as e:
             st.error(f"❌ Error computing automation risk: {e}")
             import traceback
             st.error(traceback.format_exc())
+            return None
+        
+        st.success(f"✅ Computed automation risk components for {len(components)} occupations", icon="📊")
+        return components
+    
+    def compute_task_content_shares(self) -> Optional[pd.DataFrame]:
+        """
+        Per-occupation routine / manual / interpersonal task shares from Task Statements,
+        computed with one compiled phrase matcher and memoized per data version.
+        When Task Ratings are loaded, each task counts with its importance weight.
+        """
+        if self.task_statements_df is None:
+            return None
+        
+        def build():
+            code_col = self._find_column(self.task_statements_df, ['O*NET-SOC Code', 'Code', 'SOC Code'])
+            task_col = self._find_column(self.task_statements_df, ['Task'])
+            if not code_col or not task_col:
+                return None
+            weights = None
+            task_id_col = self._find_column(self.task_statements_df, ['Task ID'])
+            if self.task_ratings is not None and task_id_col:
+                weights = self.task_ratings.lookup(self.task_statements_df[code_col], self.task_statements_df[task_id_col])
+            return TaskPhraseMatcher().occupation_shares(self.task_statements_df, code_col=code_col,
+                                                         task_col=task_col, weights=weights)
+        
+        return _memoize(self.data_version, "task_content_shares", build)
+    
+    def compute_task_content_measures(self) -> Optional[pd.DataFrame]:
+        """
+        Routine cognitive, routine manual, non-routine analytic and interpersonal
+        measures (z-scores across occupations) from Work Activities and Work Context.
+        Built once per data version.
+        """
+        if self.work_activities_df is None and self.work_context_df is None:
+            return None
+        return _memoize(
+            self.data_version, "task_content_measures",
+            lambda: compute_task_content_measures([self.work_activities_df, self.work_context_df])
+        )
+    
+    def compute_release_records(self) -> pd.DataFrame:
+        """Hashed (occupation, element, scale) records of all rating tables, built once per data version"""
+        def build():
+            self.prefetch(["skills_df", "knowledge_df", "abilities_df", "work_activities_df", "work_context_df"])
+            return release_records({
+                "Skills": self.skills_df,
+                "Knowledge": self.knowledge_df,
+                "Abilities": self.abilities_df,
+                "Work Activities": self.work_activities_df,
+                "Work Context": self.work_context_df,
+            })
+        
+        return _memoize(self.data_version, "release_records", build)
+    
+    def compute_element_matrices(self) -> Optional[OccupationElementMatrices]:
+        """
+        Dense occupation × element matrices (one float32 matrix per scale: IM, LV)
+        pivoted from Skills, Knowledge and Abilities. Built once per data version.
+        """
+        def build():
+            self.prefetch(["skills_df", "knowledge_df", "abilities_df"])
+            tables = {
+                "Skills": self.skills_df,
+                "Knowledge": self.knowledge_df,
+                "Abilities": self.abilities_df,
+            }
+            return OccupationElementMatrices.from_long_tables(tables)
+        
+        return _memoize(self.data_version, "element_matrices", build)
+    
+    def compute_occupation_similarity(self, k: int = 20) -> Optional[OccupationSimilarity]:
+        """
+        Top-k cosine similarity between occupations over their skill and knowledge
+        importance vectors (blocked matrix products). Built once per data version.
+        """
+        matrices = self.compute_element_matrices()
+        if matrices is None:
+            return None
+        return _memoize(self.data_version, "occupation_similarity", lambda: OccupationSimilarity.from_matrices(matrices, k=k), k)
+    
+    def compute_occupation_clusters(self, n_clusters: int = 8, seed: int = 0) -> Optional[OccupationClusters]:
+        """Seeded mini-batch k-means over skill, knowledge and ability vectors, built once per data version"""
+        matrices = self.compute_element_matrices()
+        if matrices is None:
+            return None
+        return _memoize(self.data_version, "occupation_clusters",
+                        lambda: OccupationClusters.from_matrices(matrices, n_clusters=n_clusters, seed=seed),
+                        n_clusters, seed)
+    
+    def compute_cluster_risk(self, risk_df: pd.DataFrame, n_clusters: int = 8, seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Risk per occupation with its cluster, and a per-cluster summary
+        (size, mean / median risk, high-risk share, top elements)
+        """
+        clusters = self.compute_occupation_clusters(n_clusters, seed)
+        if clusters is None or risk_df.empty:
+            return pd.DataFrame(), pd.DataFrame()
+        members = clusters.assignments().merge(
+            risk_df.drop_duplicates("O*NET Code")[["O*NET Code", "Occupation", "Automation Risk Score"]],
+            on="O*NET Code", how="inner"
+        )
+        summary = members.groupby("Cluster")["Automation Risk Score"].agg(
+            Mean_Risk="mean", Median_Risk="median", High_Risk_Share=lambda r: (r > 0.67).mean()
+        ).rename(columns=lambda c: c.replace("_", " ")).reset_index()
+        summary = clusters.top_elements().merge(summary, on="Cluster", how="left")
+        return members, summary.sort_values("Mean Risk", ascending=False, ignore_index=True)
+    
+    def compute_occupation_map(self) -> Optional[OccupationMap]:
+        """2-D randomized-PCA embedding of occupations, built once per data version"""
+        matrices = self.compute_element_matrices()
+        if matrices is None:
+            return None
+        return _memoize(self.data_version, "occupation_map", lambda: OccupationMap.from_matrices(matrices))
+    
+    def compute_transition_recommendations(self, risk_df: pd.DataFrame, min_risk: float = 0.67, k: int = 5) -> pd.DataFrame:
+        """
+        Nearest lower-risk occupations for every high-risk occupation in risk_df
+        (output of compute_automation_risk_score)
+        """
+        similarity = self.compute_occupation_similarity()
+        if similarity is None or risk_df.empty:
+            st.warning("⚠️ Skills/Knowledge data not available for transition recommendations")
             return pd.DataFrame()
+        return similarity.lower_risk_transitions(risk_df, min_risk=min_risk, k=k)
+    
+    def compute_transition_graph(self) -> Optional[TransitionGraph]:
+        """
+        Sparse k-NN transition graph over occupations. Built once per data version
+        and persisted to the cache directory, so later sessions only load it.
+        """
+        def build():
+            # v2: graphs persisted before the incremental neighbor fix may hold wrong neighbors
+            path = os.path.join(ONET_CACHE_DIR, f"transition_graph-v2-{self.data_version}.npz")
+            if self.data_version and os.path.exists(path):
+                try:
+                    return TransitionGraph.load(path)
+                except Exception as e:
+                    st.warning(f"Could not load cached transition graph {path}: {e}")
+            similarity = self.compute_occupation_similarity()
+            if similarity is None:
+                return None
+            graph = TransitionGraph.from_similarity(similarity)
+            if self.data_version:
+                try:
+                    os.makedirs(ONET_CACHE_DIR, exist_ok=True)
+                    graph.save(path)
+                except Exception as e:
+                    st.warning(f"Could not persist transition graph {path}: {e}")
+            return graph
         
-        risk_df = pd.DataFrame(risk_data)
-        st.success(f"✅ Computed automation risk for {len(risk_df)} occupations", icon="📊")
+        return _memoize(self.data_version, "transition_graph", build)
+    
+    def find_retraining_path(self, risk_df: pd.DataFrame, source: str, target: str, risk_weight: float = 1.0) -> pd.DataFrame:
+        """
+        Cheapest multi-step transition route from a source to a target occupation.
+        Edge cost = skill distance (1 - cosine similarity) + risk_weight * destination risk.
+        """
+        graph = self.compute_transition_graph()
+        if graph is None:
+            return pd.DataFrame()
+        risk = risk_df.drop_duplicates("O*NET Code").set_index("O*NET Code")
+        risk_by_row = risk["Automation Risk Score"].reindex(graph.occupations).to_numpy(dtype=float)
         
-        # Show distribution
-        high_risk = len(risk_df[risk_df["Automation Risk Score"] > 0.67])
-        med_risk = len(risk_df[(risk_df["Automation Risk Score"] >= 0.33) & (risk_df["Automation Risk Score"] <= 0.67)])
-        low_risk = len(risk_df[risk_df["Automation Risk Score"] < 0.33])
-        st.info(f"🟢 Low: {low_risk} | 🟡 Medium: {med_risk} | 🔴 High: {high_risk}")
+        route, total_cost = graph.shortest_path(source, target, risk_by_row, risk_weight=risk_weight)
+        if not route:
+            return pd.DataFrame()
+        codes = graph.occupations[route]
+        return pd.DataFrame({
+            "Step": np.arange(len(route)),
+            "O*NET Code": codes,
+            "Occupation": risk["Occupation"].reindex(codes).to_numpy(),
+            "Automation Risk Score": risk_by_row[route],
+        })
+    
+    def compute_task_index(self) -> Optional[TaskTextIndex]:
+        """TF-IDF index over Task Statements, built once per data version"""
+        if self.task_statements_df is None:
+            return None
         
-        return risk_df
+        def build():
+            code_col = self._find_column(self.task_statements_df, ['O*NET-SOC Code', 'Code', 'SOC Code'])
+            task_col = self._find_column(self.task_statements_df, ['Task'])
+            if not code_col or not task_col:
+                return None
+            return TaskTextIndex.from_tasks(self.task_statements_df, code_col=code_col, task_col=task_col)
+        
+        return _memoize(self.data_version, "task_index", build)
+    
+    def search_occupations_by_task(self, risk_df: pd.DataFrame, query: str, k: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Occupations and individual task statements matching a free-text query"""
+        index = self.compute_task_index()
+        if index is None or not query.strip():
+            return pd.DataFrame(), pd.DataFrame()
+        risk = risk_df.drop_duplicates("O*NET Code")[["O*NET Code", "Occupation", "Automation Risk Score"]]
+        occupations = index.search(query, k=k).merge(risk, on="O*NET Code", how="left")
+        tasks = index.search_tasks(query, k=k).merge(risk[["O*NET Code", "Occupation"]], on="O*NET Code", how="left")
+        return occupations, tasks
+    
+    def compute_task_overlap(self, risk_df: pd.DataFrame, code: str, k: int = 10) -> pd.DataFrame:
+        """Occupations with the most similar task content to one occupation"""
+        index = self.compute_task_index()
+        if index is None:
+            return pd.DataFrame()
+        risk = risk_df.drop_duplicates("O*NET Code")[["O*NET Code", "Occupation", "Automation Risk Score"]]
+        return index.task_overlap(code, k=k).merge(risk, on="O*NET Code", how="left")
     
     def compute_skill_analysis(self) -> pd.DataFrame:
         """
@@ -275,50 +1004,124 @@ class ONETDataLoader:
             st.error(f"❌ Error analyzing skills: {e}")
             return pd.DataFrame()
     
+    def _technology_columns(self) -> Optional[Dict[str, str]]:
+        """Resolve the Technology Skills columns (occupation, technology, commodity, hot flag)"""
+        tech_data = self.technology_df
+        columns = {
+            "code": self._find_column(tech_data, ["O*NET-SOC Code", "Code", "SOC Code"]),
+            "technology": self._find_column(tech_data, ["Example", "Technology Example", "Technology", "Name"]),
+            "commodity": self._find_column(tech_data, ["Commodity Title", "Commodity"]),
+            "hot": self._find_column(tech_data, ["Hot Technology"]),
+        }
+        if not columns["code"] or not columns["technology"]:
+            return None
+        return columns
+    
     def compute_technology_analysis(self) -> pd.DataFrame:
         """
-        Analyze technology data directly from O*NET
+        Technology adoption aggregated per technology: number of distinct occupations
+        using it, its commodity category and hot-technology flag, ranked by adoption
         """
         if self.technology_df is None or self.technology_df.empty:
             st.warning("⚠️ Technology data not available")
             return pd.DataFrame()
         
         try:
-            tech_data = self.technology_df.copy()
-            
-            st.info(f"📋 Technology columns: {list(tech_data.columns[:5])}")
+            columns = self._technology_columns()
+            if columns is None:
+                st.warning("⚠️ Could not find occupation / technology columns in technology data")
+                return pd.DataFrame()
             
-            # Find relevant columns
-            tech_col = self._find_column(tech_data, ["Technology Example", "Technology", "Name", "Title", "tech"])
-            value_col = self._find_column(tech_data, ["Data Value", "Value", "Level", "Importance"])
+            tech_data = self.technology_df
+            occ_codes, occupations = pd.factorize(tech_data[columns["code"]].astype(str).str.strip())
+            tech_codes, technologies = pd.factorize(tech_data[columns["technology"]].astype(str).str.strip())
+            n_tech = len(technologies)
             
-            if not tech_col:
-                tech_col = tech_data.columns[0]
-            if not value_col:
-                numeric_cols = tech_data.select_dtypes(include=[np.number]).columns
-                value_col = numeric_cols[0] if len(numeric_cols) > 0 else None
+            # distinct (technology, occupation) pairs, then a grouped count per technology
+            pairs = np.unique(tech_codes.astype(np.int64) * len(occupations) + occ_codes)
+            adoption = np.bincount(pairs // len(occupations), minlength=n_tech)
             
-            if not value_col:
-                st.warning("⚠️ Could not find numeric value column in technology data")
-                return pd.DataFrame()
+            result = pd.DataFrame({
+                "Technology": technologies.astype(str),
+                "Adoption Level": adoption,
+                "Adoption Normalized": adoption / len(occupations),
+            })
             
-            result = tech_data.copy()
-            result["Technology"] = result[tech_col].astype(str)
-            result["Adoption Level"] = pd.to_numeric(result[value_col], errors="coerce").fillna(0)
+            # first commodity per technology
+            if columns["commodity"]:
+                first_row = np.full(n_tech, -1)
+                first_row[tech_codes[::-1]] = np.arange(len(tech_codes))[::-1]
+                result["Commodity"] = tech_data[columns["commodity"]].astype(str).to_numpy()[first_row]
             
-            # Normalize
-            max_adoption = result["Adoption Level"].max()
-            result["Adoption Normalized"] = result["Adoption Level"] / max_adoption if max_adoption > 0 else result["Adoption Level"]
+            # hot technology if flagged on any row
+            if columns["hot"]:
+                hot_rows = tech_data[columns["hot"]].astype(str).str.upper().str.startswith("Y").to_numpy()
+                result["Hot Technology"] = np.bincount(tech_codes, weights=hot_rows, minlength=n_tech) > 0
             
-            return result[["Technology", "Adoption Level", "Adoption Normalized"]].drop_duplicates()
+            return result.sort_values("Adoption Level", ascending=False, ignore_index=True)
         
         except Exception as e:
             st.error(f"❌ Error analyzing technology: {e}")
             return pd.DataFrame()
     
+    def compute_technology_rankings(self, tech_df: pd.DataFrame, top_n: int = 25) -> Dict[str, pd.DataFrame]:
+        """
+        Pre-ranked top-N tables for the dashboard charts:
+        - "technology": most widely used technologies
+        - "commodity": commodity categories by distinct occupations and technologies
+        - "hot": hot vs. other technologies (technology count, mean adoption)
+        """
+        rankings = {"technology": tech_df.head(top_n)}
+        if tech_df.empty:
+            return rankings
+        
+        columns = self._technology_columns()
+        if "Commodity" in tech_df.columns and columns and columns["commodity"]:
+            tech_data = self.technology_df
+            occ_codes, occupations = pd.factorize(tech_data[columns["code"]].astype(str).str.strip())
+            tech_codes, technologies = pd.factorize(tech_data[columns["technology"]].astype(str).str.strip())
+            com_codes, commodities = pd.factorize(tech_data[columns["commodity"]].astype(str))
+            com_codes = com_codes.astype(np.int64)
+            occ_pairs = np.unique(com_codes * len(occupations) + occ_codes)
+            tech_pairs = np.unique(com_codes * len(technologies) + tech_codes)
+            commodity_df = pd.DataFrame({
+                "Commodity": commodities.astype(str),
+                "Occupations": np.bincount(occ_pairs // len(occupations), minlength=len(commodities)),
+                "Technologies": np.bincount(tech_pairs // len(technologies), minlength=len(commodities)),
+            })
+            rankings["commodity"] = commodity_df.nlargest(top_n, "Occupations")
+        
+        if "Hot Technology" in tech_df.columns:
+            rankings["hot"] = tech_df.groupby("Hot Technology").agg(
+                Technologies=("Technology", "size"),
+                Mean_Adoption=("Adoption Level", "mean"),
+            ).rename(columns={"Mean_Adoption": "Mean Adoption"}).reset_index()
+        
+        return rankings
+    
+    def technology_detail(self, technology: str) -> pd.DataFrame:
+        """Occupations using one technology (queried on demand, not precomputed)"""
+        columns = self._technology_columns() if self.technology_df is not None else None
+        if columns is None:
+            return pd.DataFrame()
+        tech_data = self.technology_df
+        rows = tech_data[columns["technology"]].astype(str).str.strip() == technology
+        detail = pd.DataFrame({"O*NET Code": tech_data.loc[rows, columns["code"]].astype(str).str.strip()})
+        if self.occupations_df is not None:
+            code_col = self._find_column(self.occupations_df, ["O*NET-SOC Code", "Code", "SOC Code"])
+            title_col = self._find_column(self.occupations_df, ["Title", "Occupation"])
+            if code_col and title_col:
+                titles = self.occupations_df.set_index(self.occupations_df[code_col].astype(str).str.strip())[title_col]
+                detail["Occupation"] = titles.reindex(detail["O*NET Code"]).to_numpy()
+        return detail.drop_duplicates("O*NET Code", ignore_index=True)
+    
     def _find_column(self, df: pd.DataFrame, possible_names: List[str]) -> str:
         """Find column name from possible variations"""
-        df_cols_lower = [col.lower() for col in df.columns]
+        df_cols_lower = [str(col).lower() for col in df.columns]
+        # exact names first ("Task" must not resolve to "Task ID")
+        for name in possible_names:
+            if name.lower() in df_cols_lower:
+                return df.columns[df_cols_lower.index(name.lower())]
         for name in possible_names:
             name_lower = name.lower()
             for i, col in enumerate(df_cols_lower):
@@ -326,43 +1129,201 @@ class ONETDataLoader:
                     return df.columns[i]
         return None
     
-    def _normalize_value(self, value) -> float:
-        """Normalize value to 0-1 range"""
-        if pd.isna(value):
-            return 0.5
-        
-        try:
-            value = float(value)
-            if value > 100:
-                return np.clip(value / 100, 0, 1)
-            return np.clip(value, 0, 1)
-        except:
-            return 0.5
-    
-    def _categorize_risk(self, risk_score: float) -> str:
-        """Categorize automation risk"""
-        if risk_score < 0.33:
-            return "🟢 Low Risk"
-        elif risk_score < 0.67:
-            return "🟡 Medium Risk"
-        else:
-            return "🔴 High Risk"
+    def _normalize_array(self, values: np.ndarray) -> np.ndarray:
+        """Normalize values to 0-1 range (percent-scale values above 100 are divided by 100, missing -> 0.5)"""
+        values = np.where(values > 100, values / 100, values)
+        return np.where(np.isnan(values), 0.5, np.clip(values, 0, 1))
+    
+    def _categorize_risk_array(self, risk_scores: np.ndarray) -> np.ndarray:
+        """Categorize automation risk (< 0.33 low, < 0.67 medium, else high)"""
+        labels = np.array(["🟢 Low Risk", "🟡 Medium Risk", "🔴 High Risk"], dtype=object)
+        return labels[np.searchsorted([0.33, 0.67], risk_scores, side="right")]
 
 
-def load_onet_analysis() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+class ONETAnalysis:
     """
-    Main function to load and analyze O*NET data
-    Returns: (automation_risk_df, skills_df, technology_df)
+    Lazy analysis layer over an ONETDataLoader.
+    
+    Each artifact is computed on first access and memoized per data version, so a
+    dashboard view only pays for (and only parses the files behind) what it shows.
     """
-    loader = ONETDataLoader()
     
-    # Load files
-    if not loader.load_onet_files():
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    def __init__(self, loader: ONETDataLoader):
+        self.loader = loader
+    
+    @property
+    def data_version(self) -> Optional[str]:
+        return self.loader.data_version
     
-    # Compute metrics
-    risk_df = loader.compute_automation_risk_score()
-    skills_df = loader.compute_skill_analysis()
-    tech_df = loader.compute_technology_analysis()
+    def risk(self, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """
+        Automation risk per occupation (Occupation Data, task and work-activity tables).
+        Components are cached; a new weighting is one matrix-vector product.
+        """
+        return self.loader.compute_automation_risk_score(weights)
     
-    return risk_df, skills_df, tech_df
\ No newline at end of file
+    @staticmethod
+    def _weights_key(weights: Optional[Dict[str, float]]) -> Tuple:
+        return tuple(RiskComponents.weight_vector(weights).round(4).tolist())
+    
+    def search_index(self, weights: Optional[Dict[str, float]] = None) -> OccupationSearchIndex:
+        """Title/code prefix index and presorted score indexes over the risk table"""
+        return _memoize(self.data_version, "search_index", lambda: OccupationSearchIndex(self.risk(weights)),
+                        self._weights_key(weights), max_entries=_MAX_WEIGHTED_ENTRIES)
+    
+    def country_exposure(self, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """
+        Employment-weighted automation exposure per country and year, bridging O*NET
+        occupations to ILOSTAT employment by ISCO-08 group through a local SOC↔ISCO
+        crosswalk file (empty if either file is missing)
+        """
+        crosswalk_file, employment_file = _find_isco_files()
+        if not crosswalk_file or not employment_file:
+            return pd.DataFrame()
+        
+        def build():
+            crosswalk = SocIscoCrosswalk.from_frame(_read_table(crosswalk_file))
+            if crosswalk is None:
+                st.warning(f"Could not find SOC / ISCO code columns in {crosswalk_file}")
+                return pd.DataFrame()
+            employment = load_isco_employment(employment_file)
+            risk_df = self.risk(weights)
+            if employment.empty or risk_df.empty:
+                return pd.DataFrame()
+            risk_df = risk_df.assign(**{"High Risk Share": (risk_df["Automation Risk Score"] > 0.67).astype(float)})
+            metrics = ["Automation Risk Score", "High Risk Share"] + RISK_COMPONENTS
+            return country_exposure(employment, crosswalk, risk_df, metrics)
+        
+        return _memoize(self.data_version, "country_exposure", build,
+                        _file_fingerprint(crosswalk_file), _file_fingerprint(employment_file), self._weights_key(weights),
+                        max_entries=_MAX_WEIGHTED_ENTRIES)
+    
+    def soc_rollups(self, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Risk statistics per SOC major group, minor group, broad and detailed occupation"""
+        def build():
+            risk_df = self.risk(weights)
+            if risk_df.empty:
+                return pd.DataFrame()
+            return soc_rollups(risk_df["O*NET Code"], risk_df["Automation Risk Score"].to_numpy())
+        
+        return _memoize(self.data_version, "soc_rollups", build, self._weights_key(weights),
+                        max_entries=_MAX_WEIGHTED_ENTRIES)
+    
+    def skills(self) -> pd.DataFrame:
+        """Skill transferability analysis (Skills)"""
+        return _memoize(self.data_version, "skills", self.loader.compute_skill_analysis)
+    
+    def technology(self) -> pd.DataFrame:
+        """Technology adoption analysis (Technology Skills)"""
+        return _memoize(self.data_version, "technology", self.loader.compute_technology_analysis)
+    
+    def technology_rankings(self, top_n: int = 25) -> Dict[str, pd.DataFrame]:
+        """Pre-ranked top-N technology, commodity and hot-technology tables"""
+        return _memoize(self.data_version, "technology_rankings",
+                        lambda: self.loader.compute_technology_rankings(self.technology(), top_n=top_n), top_n)
+    
+    def transitions(self, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Lower-risk transition recommendations (Skills, Knowledge, Abilities + risk)"""
+        return _memoize(self.data_version, "transitions",
+                        lambda: self.loader.compute_transition_recommendations(self.risk(weights)),
+                        self._weights_key(weights), max_entries=_MAX_WEIGHTED_ENTRIES)
+
+
+def compare_onet_releases(baseline: ONETAnalysis, current: ONETAnalysis,
+                          weights: Optional[Dict[str, float]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Diff two O*NET releases and report which occupations' risk and neighbors changed.
+    
+    What is incremental and what is not:
+    - Similarity neighbors are incremental. Rating records (Skills, Knowledge,
+      Abilities, Work Activities, Work Context) are joined on hashed (occupation,
+      element, scale) keys, and only occupations touched by a changed / added /
+      removed record, or added / removed outright, seed the incremental update of
+      the current release's similarity table from the baseline's.
+    - Risk is not incremental. Its components also depend on Occupation Data, Task
+      Statements and Task Ratings, and are percentile ranks across occupations, so
+      each release's risk table is built in full once and memoized per data version
+      (shared with the other views). The two tables are then diffed by code, and
+      every occupation whose risk score moved is reported even if no rating
+      record changed.
+    
+    Returns:
+        {"records": record-level diff, "report": per-occupation change report ranked
+         by absolute risk change}
+    """
+    def build():
+        records = diff_release_records(baseline.loader.compute_release_records(),
+                                       current.loader.compute_release_records())
+        old_risk = baseline.risk(weights)
+        new_risk = current.risk(weights)
+        old_codes = pd.Index(old_risk["O*NET Code"]) if not old_risk.empty else pd.Index([])
+        new_codes = pd.Index(new_risk["O*NET Code"]) if not new_risk.empty else pd.Index([])
+        
+        # occupations whose element vectors changed (the only input to similarity)
+        touched = pd.Index(records["O*NET Code"].unique()).union(old_codes.symmetric_difference(new_codes))
+        
+        # occupations whose risk moved, whatever the input table
+        old_by_code = old_risk.drop_duplicates("O*NET Code").set_index("O*NET Code") if not old_risk.empty else pd.DataFrame()
+        new_by_code = new_risk.drop_duplicates("O*NET Code").set_index("O*NET Code") if not new_risk.empty else pd.DataFrame()
+        risk_changed = old_codes.intersection(new_codes)
+        if len(risk_changed):
+            old_scores = old_by_code["Automation Risk Score"].reindex(risk_changed).to_numpy(dtype=float)
+            new_scores = new_by_code["Automation Risk Score"].reindex(risk_changed).to_numpy(dtype=float)
+            risk_changed = risk_changed[~np.isclose(old_scores, new_scores, rtol=0.0, atol=1e-6, equal_nan=True)]
+        reported = touched.union(risk_changed)
+        
+        # incremental neighbor update for the current release (memoized under its version)
+        neighbors_changed = pd.Series(np.nan, index=reported)
+        previous = baseline.loader.compute_occupation_similarity()
+        matrices = current.loader.compute_element_matrices()
+        if previous is not None and matrices is not None:
+            def update():
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter("always")
+                    updated = OccupationSimilarity.incremental(previous, matrices, touched)
+                for w in caught:
+                    st.warning(f"⚠️ {w.message}")
+                return updated
+            
+            updated = _memoize(current.data_version, "occupation_similarity", update, previous.k)
+            old_rows = previous.occupations.get_indexer(reported)
+            new_rows = updated.occupations.get_indexer(reported)
+            for code, o, n in zip(reported, old_rows, new_rows):
+                if o >= 0 and n >= 0:
+                    old_set = set(previous.occupations[previous.indices[o]])
+                    new_set = set(updated.occupations[updated.indices[n]])
+                    neighbors_changed[code] = len(new_set - old_set)
+        
+        counts = records.groupby(["O*NET Code", "Status"]).size().unstack(fill_value=0) \
+            .reindex(columns=["changed", "added", "removed"], fill_value=0)
+        counts.columns = ["Records Changed", "Records Added", "Records Removed"]
+        
+        report = pd.DataFrame(index=reported.rename("O*NET Code"))
+        report["Occupation"] = new_by_code["Occupation"].reindex(reported) if not new_by_code.empty else np.nan
+        if not old_by_code.empty:
+            report["Occupation"] = report["Occupation"].fillna(old_by_code["Occupation"].reindex(reported))
+        report["Status"] = np.where(~reported.isin(old_codes), "added",
+                                    np.where(~reported.isin(new_codes), "removed", "changed"))
+        report = report.join(counts).fillna({c: 0 for c in counts.columns})
+        report["Old Risk"] = old_by_code["Automation Risk Score"].reindex(reported).to_numpy() if not old_by_code.empty else np.nan
+        report["New Risk"] = new_by_code["Automation Risk Score"].reindex(reported).to_numpy() if not new_by_code.empty else np.nan
+        report["Risk Change"] = report["New Risk"] - report["Old Risk"]
+        report["Neighbors Changed"] = neighbors_changed.to_numpy()
+        report = report.reset_index()
+        report = report.iloc[np.argsort(-report["Risk Change"].abs().fillna(np.inf).to_numpy(), kind="stable")]
+        return {"records": records, "report": report.reset_index(drop=True)}
+    
+    return _memoize(current.data_version, "release_diff", build, baseline.data_version, ONETAnalysis._weights_key(weights),
+                    max_entries=_MAX_WEIGHTED_ENTRIES)
+
+
+def load_onet_analysis(release_zip: Optional[str] = None) -> Optional[ONETAnalysis]:
+    """
+    Main entry point for the O*NET dashboard: discovers the O*NET files and
+    returns the lazy analysis layer (None if no files were found)
+    release_zip selects a specific release archive (default: the one found in the current directory)
+    """
+    loader = ONETDataLoader(release_zip)
+    if not loader.load_onet_files():
+        return None
+    return ONETAnalysis(loader)
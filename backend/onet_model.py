@@ -0,0 +1,1138 @@
+# ============================================================
+# O*NET Occupation Models
+# Occupation × element matrices and matrix-based analyses
+# ============================================================
+
+import heapq
+import warnings
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from typing import Dict, List, Optional
+
+# Rating scale ranges used to rescale O*NET values to 0–1
+# IM = importance (1–5), LV = level (0–7), CX = work context (1–5)
+SCALE_RANGES = {
+    "IM": (1.0, 5.0),
+    "LV": (0.0, 7.0),
+    "CX": (1.0, 5.0),
+}
+
+
+class OccupationElementMatrices:
+    """
+    Dense occupation × element matrices built from O*NET long tables
+    (Skills, Knowledge, Abilities, ...).
+
+    One float32 matrix per rating scale (IM, LV), all sharing the same
+    index maps:
+    - occupations: O*NET-SOC codes (rows)
+    - elements: (Domain, Element Name) pairs (columns)
+
+    Elements an occupation has no rating for are 0.
+    """
+
+    def __init__(self, occupations: pd.Index, elements: pd.MultiIndex, matrices: Dict[str, np.ndarray]):
+        self.occupations = occupations
+        self.elements = elements
+        self.matrices = matrices
+
+    @property
+    def shape(self):
+        return (len(self.occupations), len(self.elements))
+
+    @property
+    def scales(self) -> List[str]:
+        return list(self.matrices.keys())
+
+    def __repr__(self):
+        return f"OccupationElementMatrices(shape={self.shape}, scales={self.scales})"
+
+    # --------------------------------------------------------
+    # Construction (one vectorized pivot per scale)
+    # --------------------------------------------------------
+    @classmethod
+    def from_long_tables(cls, tables: Dict[str, pd.DataFrame], scales=("IM", "LV")):
+        """
+        Pivot long O*NET tables into dense matrices.
+
+        Args:
+            tables: Domain name -> long table with columns
+                    "O*NET-SOC Code", "Element Name", "Scale ID", "Data Value"
+            scales: Scale IDs to build a matrix for
+
+        Returns:
+            OccupationElementMatrices (None if no table has the required columns)
+        """
+        required = ["O*NET-SOC Code", "Element Name", "Scale ID", "Data Value"]
+        parts = []
+        for domain, df in tables.items():
+            if df is None or df.empty or not all(c in df.columns for c in required):
+                continue
+            part = df[required].copy()
+            part["Domain"] = domain
+            parts.append(part)
+        if not parts:
+            return None
+
+        long = pd.concat(parts, ignore_index=True)
+        long["Scale ID"] = long["Scale ID"].astype(str)
+        long = long[long["Scale ID"].isin(scales)]
+
+        # Shared integer index maps for rows and columns
+        occ_codes, occupations = pd.factorize(long["O*NET-SOC Code"].astype(str).str.strip(), sort=True)
+        elements = pd.MultiIndex.from_arrays(
+            [long["Domain"].astype(str), long["Element Name"].astype(str)], names=["Domain", "Element"]
+        )
+        elem_codes, elements = elements.factorize(sort=True)
+        elements = pd.MultiIndex.from_tuples(list(elements), names=["Domain", "Element"])
+        values = pd.to_numeric(long["Data Value"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float32)
+        scale_ids = long["Scale ID"].to_numpy()
+
+        matrices = {}
+        for scale in scales:
+            mask = scale_ids == scale
+            if not mask.any():
+                continue
+            M = np.zeros((len(occupations), len(elements)), dtype=np.float32)
+            M[occ_codes[mask], elem_codes[mask]] = values[mask]
+            matrices[scale] = M
+
+        return cls(pd.Index(occupations, name="O*NET-SOC Code"), elements, matrices)
+
+    # --------------------------------------------------------
+    # Accessors
+    # --------------------------------------------------------
+    def matrix(self, scale: str = "IM", domains: Optional[List[str]] = None, scaled: bool = True) -> np.ndarray:
+        """
+        Matrix for one scale, optionally restricted to some domains.
+        scaled=True rescales ratings to 0–1 using SCALE_RANGES.
+        """
+        M = self.matrices[scale]
+        if domains is not None:
+            M = M[:, self.domain_mask(domains)]
+        if scaled and scale in SCALE_RANGES:
+            lo, hi = SCALE_RANGES[scale]
+            M = np.clip((M - lo) / (hi - lo), 0.0, 1.0).astype(np.float32)
+        return M
+
+    def domain_mask(self, domains: List[str]) -> np.ndarray:
+        """Boolean column mask for elements in the given domains"""
+        return self.elements.get_level_values("Domain").isin(domains)
+
+    def rows_for(self, codes) -> np.ndarray:
+        """Row positions for O*NET-SOC codes (-1 where unknown)"""
+        return self.occupations.get_indexer(pd.Index(codes).astype(str).str.strip())
+
+    def to_frame(self, scale: str = "IM", scaled: bool = False) -> pd.DataFrame:
+        """Labeled DataFrame view of one scale's matrix"""
+        return pd.DataFrame(self.matrix(scale, scaled=scaled), index=self.occupations, columns=self.elements)
+
+
+# ============================================================
+# Automation Risk (weighted components)
+# ============================================================
+
+# Risk weight per component; Cognitive Complexity and Human Interaction lower risk,
+# so they enter the score as (1 - value)
+RISK_COMPONENTS = ["Routine Intensity", "Manual Intensity", "Cognitive Complexity", "Human Interaction"]
+RISK_INVERTED = ["Cognitive Complexity", "Human Interaction"]
+DEFAULT_RISK_WEIGHTS = {
+    "Routine Intensity": 0.4,
+    "Manual Intensity": 0.4,
+    "Cognitive Complexity": 0.3,
+    "Human Interaction": 0.3,
+}
+
+
+class RiskComponents:
+    """
+    Cached 0–1 risk components per occupation.
+
+    The components are stored once as an (n, 4) float32 matrix oriented so that
+    higher means more automatable; any weighting is then a single matrix-vector
+    product, so re-weighting never touches the source tables.
+    """
+
+    def __init__(self, codes: np.ndarray, titles: np.ndarray, components: np.ndarray):
+        self.codes = codes
+        self.titles = titles
+        self.components = np.asarray(components, dtype=np.float32)
+        inverted = np.array([name in RISK_INVERTED for name in RISK_COMPONENTS])
+        self._oriented = np.where(inverted, 1.0 - self.components, self.components).astype(np.float32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __repr__(self):
+        return f"RiskComponents(occupations={len(self)})"
+
+    @staticmethod
+    def weight_vector(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Weight vector in RISK_COMPONENTS order (missing components use the defaults)"""
+        weights = {**DEFAULT_RISK_WEIGHTS, **(weights or {})}
+        return np.array([weights[name] for name in RISK_COMPONENTS], dtype=np.float32)
+
+    def score(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Automation risk for every occupation: clip(components @ w, 0, 1)"""
+        return np.clip(self._oriented @ self.weight_vector(weights), 0.0, 1.0)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Codes, titles and the raw component columns"""
+        frame = pd.DataFrame(self.components, columns=RISK_COMPONENTS)
+        frame.insert(0, "Occupation", self.titles)
+        frame.insert(0, "O*NET Code", self.codes)
+        return frame
+
+
+# ============================================================
+# SOC Hierarchy Roll-ups
+# ============================================================
+
+# SOC levels, coarsest first. Codes are handled as 6-digit integers (11-1011 -> 111011);
+# major groups, broad and detailed occupations are integer prefixes of the code, minor
+# groups are not (15-1252 belongs to 15-1200), so they come from SOC_MINOR_GROUPS.
+SOC_LEVELS = ["Major Group", "Minor Group", "Broad Occupation", "Detailed Occupation"]
+
+SOC_MAJOR_GROUPS = {
+    11: "Management", 13: "Business and Financial Operations", 15: "Computer and Mathematical",
+    17: "Architecture and Engineering", 19: "Life, Physical, and Social Science",
+    21: "Community and Social Service", 23: "Legal", 25: "Educational Instruction and Library",
+    27: "Arts, Design, Entertainment, Sports, and Media", 29: "Healthcare Practitioners and Technical",
+    31: "Healthcare Support", 33: "Protective Service", 35: "Food Preparation and Serving Related",
+    37: "Building and Grounds Cleaning and Maintenance", 39: "Personal Care and Service",
+    41: "Sales and Related", 43: "Office and Administrative Support", 45: "Farming, Fishing, and Forestry",
+    47: "Construction and Extraction", 49: "Installation, Maintenance, and Repair",
+    51: "Production", 53: "Transportation and Material Moving", 55: "Military Specific",
+}
+
+# SOC 2018 minor groups; every detailed code belongs to the closest minor group at or
+# below it within its major group
+SOC_MINOR_GROUPS = {
+    "11-1000": "Top Executives",
+    "11-2000": "Advertising, Marketing, Promotions, Public Relations, and Sales Managers",
+    "11-3000": "Operations Specialties Managers",
+    "11-9000": "Other Management Occupations",
+    "13-1000": "Business Operations Specialists",
+    "13-2000": "Financial Specialists",
+    "15-1200": "Computer Occupations",
+    "15-2000": "Mathematical Science Occupations",
+    "17-1000": "Architects, Surveyors, and Cartographers",
+    "17-2000": "Engineers",
+    "17-3000": "Drafters, Engineering Technicians, and Mapping Technicians",
+    "19-1000": "Life Scientists",
+    "19-2000": "Physical Scientists",
+    "19-3000": "Social Scientists and Related Workers",
+    "19-4000": "Life, Physical, and Social Science Technicians",
+    "19-5000": "Occupational Health and Safety Specialists and Technicians",
+    "21-1000": "Counselors, Social Workers, and Other Community and Social Service Specialists",
+    "21-2000": "Religious Workers",
+    "23-1000": "Lawyers, Judges, and Related Workers",
+    "23-2000": "Legal Support Workers",
+    "25-1000": "Postsecondary Teachers",
+    "25-2000": "Preschool, Elementary, Middle, Secondary, and Special Education Teachers",
+    "25-3000": "Other Teachers and Instructors",
+    "25-4000": "Librarians, Curators, and Archivists",
+    "25-9000": "Other Educational Instruction and Library Occupations",
+    "27-1000": "Art and Design Workers",
+    "27-2000": "Entertainers and Performers, Sports and Related Workers",
+    "27-3000": "Media and Communication Workers",
+    "27-4000": "Media and Communication Equipment Workers",
+    "29-1000": "Healthcare Diagnosing or Treating Practitioners",
+    "29-2000": "Health Technologists and Technicians",
+    "29-9000": "Other Healthcare Practitioners and Technical Occupations",
+    "31-1100": "Home Health and Personal Care Aides; and Nursing Assistants, Orderlies, and Psychiatric Aides",
+    "31-2000": "Occupational Therapy and Physical Therapist Assistants and Aides",
+    "31-9000": "Other Healthcare Support Occupations",
+    "33-1000": "Supervisors of Protective Service Workers",
+    "33-2000": "Firefighting and Prevention Workers",
+    "33-3000": "Law Enforcement Workers",
+    "33-9000": "Other Protective Service Workers",
+    "35-1000": "Supervisors of Food Preparation and Serving Workers",
+    "35-2000": "Cooks and Food Preparation Workers",
+    "35-3000": "Food and Beverage Serving Workers",
+    "35-9000": "Other Food Preparation and Serving Related Workers",
+    "37-1000": "Supervisors of Building and Grounds Cleaning and Maintenance Workers",
+    "37-2000": "Building Cleaning and Pest Control Workers",
+    "37-3000": "Grounds Maintenance Workers",
+    "39-1000": "Supervisors of Personal Care and Service Workers",
+    "39-2000": "Animal Care and Service Workers",
+    "39-3000": "Entertainment Attendants and Related Workers",
+    "39-4000": "Funeral Service Workers",
+    "39-5000": "Personal Appearance Workers",
+    "39-6000": "Baggage Porters, Bellhops, and Concierges",
+    "39-7000": "Tour and Travel Guides",
+    "39-9000": "Other Personal Care and Service Workers",
+    "41-1000": "Supervisors of Sales Workers",
+    "41-2000": "Retail Sales Workers",
+    "41-3000": "Sales Representatives, Services",
+    "41-4000": "Sales Representatives, Wholesale and Manufacturing",
+    "41-9000": "Other Sales and Related Workers",
+    "43-1000": "Supervisors of Office and Administrative Support Workers",
+    "43-2000": "Communications Equipment Operators",
+    "43-3000": "Financial Clerks",
+    "43-4000": "Information and Record Clerks",
+    "43-5000": "Material Recording, Scheduling, Dispatching, and Distributing Workers",
+    "43-6000": "Secretaries and Administrative Assistants",
+    "43-9000": "Other Office and Administrative Support Workers",
+    "45-1000": "Supervisors of Farming, Fishing, and Forestry Workers",
+    "45-2000": "Agricultural Workers",
+    "45-3000": "Fishing and Hunting Workers",
+    "45-4000": "Forest, Conservation, and Logging Workers",
+    "47-1000": "Supervisors of Construction and Extraction Workers",
+    "47-2000": "Construction Trades Workers",
+    "47-3000": "Helpers, Construction Trades",
+    "47-4000": "Other Construction and Related Workers",
+    "47-5000": "Extraction Workers",
+    "49-1000": "Supervisors of Installation, Maintenance, and Repair Workers",
+    "49-2000": "Electrical and Electronic Equipment Mechanics, Installers, and Repairers",
+    "49-3000": "Vehicle and Mobile Equipment Mechanics, Installers, and Repairers",
+    "49-9000": "Other Installation, Maintenance, and Repair Occupations",
+    "51-1000": "Supervisors of Production Workers",
+    "51-2000": "Assemblers and Fabricators",
+    "51-3000": "Food Processing Workers",
+    "51-4000": "Metal Workers and Plastic Workers",
+    "51-5100": "Printing Workers",
+    "51-6000": "Textile, Apparel, and Furnishings Workers",
+    "51-7000": "Woodworkers",
+    "51-8000": "Plant and System Operators",
+    "51-9000": "Other Production Occupations",
+    "53-1000": "Supervisors of Transportation and Material Moving Workers",
+    "53-2000": "Air Transportation Workers",
+    "53-3000": "Motor Vehicle Operators",
+    "53-4000": "Rail Transportation Workers",
+    "53-5000": "Water Transportation Workers",
+    "53-6000": "Other Transportation Workers",
+    "53-7000": "Material Moving Workers",
+    "55-1000": "Military Officer Special and Tactical Operations Leaders",
+    "55-2000": "First-Line Enlisted Military Supervisors",
+    "55-3000": "Military Enlisted Tactical Operations and Air/Weapons Specialists and Crew Members",
+}
+
+RISK_LEVEL_BOUNDS = [0.33, 0.67]
+
+
+def parse_soc_codes(codes) -> np.ndarray:
+    """O*NET-SOC codes ("11-1011.00") -> 6-digit integers (111011); -1 where unparseable"""
+    digits = pd.Series(codes).astype(str).str.slice(0, 7).str.replace("-", "", regex=False)
+    return pd.to_numeric(digits, errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _format_soc(values: np.ndarray) -> np.ndarray:
+    """6-digit integers -> "XX-XXXX" SOC codes"""
+    return np.array([f"{v // 10000:02d}-{v % 10000:04d}" for v in values], dtype=object)
+
+
+_MINOR_GROUP_CODES = np.sort(parse_soc_codes(list(SOC_MINOR_GROUPS)))
+
+
+def soc_group_codes(soc: np.ndarray, level: str) -> np.ndarray:
+    """
+    Group of every 6-digit SOC integer at one SOC level (also 6-digit integers).
+    Minor groups are looked up in SOC_MINOR_GROUPS; codes of a major group missing
+    from the table fall back to the XX-X000 prefix.
+    """
+    soc = np.asarray(soc, dtype=np.int64)
+    if level == "Major Group":
+        return soc // 10000 * 10000
+    if level == "Broad Occupation":
+        return soc // 10 * 10
+    if level == "Detailed Occupation":
+        return soc
+    if level == "Minor Group":
+        pos = np.searchsorted(_MINOR_GROUP_CODES, soc, side="right") - 1
+        minor = _MINOR_GROUP_CODES[np.maximum(pos, 0)]
+        known = (pos >= 0) & (minor // 10000 == soc // 10000)
+        return np.where(known, minor, soc // 1000 * 1000)
+    raise ValueError(f"Unknown SOC level: {level}")
+
+
+def _soc_titles(groups: np.ndarray, level: str) -> List[str]:
+    """Titles of major and minor groups ("" at the other levels)"""
+    if level == "Major Group":
+        return [SOC_MAJOR_GROUPS.get(int(g // 10000), "") for g in groups]
+    if level == "Minor Group":
+        return [SOC_MINOR_GROUPS.get(code, "") for code in _format_soc(groups)]
+    return [""] * len(groups)
+
+
+def soc_rollups(codes, risk: np.ndarray, quantiles=(0.25, 0.5, 0.75)) -> pd.DataFrame:
+    """
+    Automation-risk statistics at every SOC level.
+
+    Codes are parsed to integers once; each level's group key comes from
+    soc_group_codes (an integer prefix, or the SOC 2018 minor group table for
+    minor groups). Per level there is a single sort by
+    (group, risk), after which counts, means, quantiles and risk-level counts
+    are read off with bincount and positional indexing.
+
+    Returns:
+        Long DataFrame with one row per SOC group:
+        Level, SOC Code, Parent, Title, Occupations, Mean Risk, P25/Median/P75,
+        Low/Medium/High Risk counts
+    """
+    soc = parse_soc_codes(codes)
+    risk = np.asarray(risk, dtype=float)
+    valid = (soc >= 0) & ~np.isnan(risk)
+    soc, risk = soc[valid], risk[valid]
+    risk_level = np.searchsorted(RISK_LEVEL_BOUNDS, risk, side="right")
+
+    frames = []
+    for i, level in enumerate(SOC_LEVELS):
+        key = soc_group_codes(soc, level)
+        order = np.lexsort((risk, key))
+        sorted_key, sorted_risk = key[order], risk[order]
+        groups, starts, counts = np.unique(sorted_key, return_index=True, return_counts=True)
+        group_of = np.repeat(np.arange(len(groups)), counts)
+
+        stats = {
+            "Level": level,
+            "SOC Code": _format_soc(groups),
+            "Parent": _format_soc(soc_group_codes(groups, SOC_LEVELS[i - 1])) if i > 0 else "",
+            "Title": _soc_titles(groups, level),
+            "Occupations": counts,
+            "Mean Risk": np.bincount(group_of, weights=sorted_risk) / counts,
+        }
+        for q in quantiles:
+            pos = starts + q * (counts - 1)
+            lo, hi = np.floor(pos).astype(int), np.ceil(pos).astype(int)
+            label = "Median" if q == 0.5 else f"P{int(q * 100)}"
+            stats[label] = sorted_risk[lo] + (sorted_risk[hi] - sorted_risk[lo]) * (pos - lo)
+        level_counts = np.bincount(group_of * 3 + risk_level[order], minlength=len(groups) * 3).reshape(-1, 3)
+        stats["Low Risk"], stats["Medium Risk"], stats["High Risk"] = level_counts.T
+        frames.append(pd.DataFrame(stats))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+# ============================================================
+# Occupation Similarity (cosine, blocked matrix products)
+# ============================================================
+
+def top_k_cosine_neighbors(X: np.ndarray, k: int = 20, block_size: int = 512):
+    """
+    Top-k cosine neighbors for every row of X (self excluded).
+
+    Similarities are computed block by block (block_size × n at a time), so
+    memory stays bounded while each block is one BLAS matrix product.
+
+    Returns:
+        (indices, similarities): int32 and float32 arrays of shape (n, k),
+        sorted by decreasing similarity
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n = X.shape[0]
+    k = max(0, min(k, n - 1))
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    Xn = np.divide(X, norms, out=np.zeros_like(X), where=norms > 0)
+
+    indices = np.empty((n, k), dtype=np.int32)
+    similarities = np.empty((n, k), dtype=np.float32)
+    if k == 0:
+        return indices, similarities
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = Xn[start:stop] @ Xn.T  # (b, n)
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # exclude self
+
+        part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        part_sims = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-part_sims, axis=1)
+        indices[start:stop] = np.take_along_axis(part, order, axis=1)
+        similarities[start:stop] = np.take_along_axis(part_sims, order, axis=1)
+
+    return indices, similarities
+
+
+class OccupationSimilarity:
+    """
+    Top-k occupation-to-occupation cosine similarity over O*NET element vectors.
+    Only the neighbor table (n × k) is kept, never the full n × n matrix.
+    """
+
+    def __init__(self, occupations: pd.Index, indices: np.ndarray, similarities: np.ndarray):
+        self.occupations = occupations
+        self.indices = indices
+        self.similarities = similarities
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+    def __repr__(self):
+        return f"OccupationSimilarity(occupations={len(self.occupations)}, k={self.k})"
+
+    @classmethod
+    def from_matrices(cls, matrices: OccupationElementMatrices, scale: str = "IM",
+                      domains=("Skills", "Knowledge"), k: int = 20, block_size: int = 512):
+        """Build the neighbor table from the (0–1 scaled) skill and knowledge vectors"""
+        X = matrices.matrix(scale, domains=list(domains) if domains else None)
+        indices, similarities = top_k_cosine_neighbors(X, k=k, block_size=block_size)
+        return cls(matrices.occupations, indices, similarities)
+
+    @classmethod
+    def incremental(cls, previous: "OccupationSimilarity", matrices: OccupationElementMatrices, touched,
+                    scale: str = "IM", domains=("Skills", "Knowledge"), block_size: int = 512,
+                    verify: int = 64):
+        """
+        Neighbor table for a new release, recomputing only touched occupations.
+
+        Touched rows (changed or added occupations) get a fresh top-k against all
+        rows, and so do untouched rows that had any touched or removed occupation
+        among their previous neighbors (their next-best untouched neighbor is not
+        in the old table). The remaining untouched rows keep all k previous
+        neighbors, whose similarities cannot have changed, and merge in
+        similarities to the touched rows only, which is exact.
+
+        verify rows (sampled with a fixed seed) are checked against an exact top-k;
+        on a mismatch a warning is issued and the table is rebuilt in full. Falls
+        back to a full rebuild if most rows are touched.
+        """
+        k = previous.k
+        X = matrices.matrix(scale, domains=list(domains) if domains else None)
+        n = X.shape[0]
+        touched_rows = np.unique(matrices.rows_for(list(touched)))
+        touched_rows = touched_rows[touched_rows >= 0]
+        prev_rows = previous.occupations.get_indexer(matrices.occupations)  # new row -> previous row
+        is_touched = np.zeros(n, dtype=bool)
+        is_touched[touched_rows] = True
+        is_touched |= prev_rows < 0  # added occupations
+        touched_rows = np.flatnonzero(is_touched)
+        if len(touched_rows) > n // 2 or k == 0 or k > n - 1:
+            return cls.from_matrices(matrices, scale=scale, domains=domains, k=k, block_size=block_size)
+
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        Xn = np.divide(X, norms, out=np.zeros_like(X), where=norms > 0)
+        indices = np.empty((n, k), dtype=np.int32)
+        similarities = np.empty((n, k), dtype=np.float32)
+
+        def select(cand_idx, cand_sims, rows):
+            part = np.argpartition(-cand_sims, k - 1, axis=1)[:, :k]
+            part_sims = np.take_along_axis(cand_sims, part, axis=1)
+            order = np.argsort(-part_sims, axis=1)
+            indices[rows] = np.take_along_axis(np.take_along_axis(cand_idx, part, axis=1), order, axis=1)
+            similarities[rows] = np.take_along_axis(part_sims, order, axis=1)
+
+        def recompute(rows_to_update):
+            for start in range(0, len(rows_to_update), block_size):
+                rows = rows_to_update[start:start + block_size]
+                block = Xn[rows] @ Xn.T
+                block[np.arange(len(rows)), rows] = -np.inf
+                select(np.broadcast_to(np.arange(n), block.shape), block, rows)
+
+        # touched rows: fresh top-k against every row
+        recompute(touched_rows)
+
+        # untouched rows: previous neighbors, mapped to new rows
+        untouched_rows = np.flatnonzero(~is_touched)
+        new_row_of_prev = np.full(len(previous.occupations), -1)
+        new_row_of_prev[prev_rows[prev_rows >= 0]] = np.flatnonzero(prev_rows >= 0)
+        kept_idx = new_row_of_prev[previous.indices[prev_rows[untouched_rows]]]
+        stale = ((kept_idx < 0) | is_touched[np.maximum(kept_idx, 0)]).any(axis=1)
+
+        # any stale neighbor: the replacement may be an untouched row outside the old table
+        recompute(untouched_rows[stale])
+
+        # all k neighbors still valid: merge in similarities to the touched rows
+        merge_rows, merge_idx = untouched_rows[~stale], kept_idx[~stale]
+        for start in range(0, len(merge_rows), block_size):
+            rows = merge_rows[start:start + block_size]
+            kept_sims = previous.similarities[prev_rows[rows]].astype(np.float32)
+            fresh_sims = Xn[rows] @ Xn[touched_rows].T
+            cand_idx = np.hstack([merge_idx[start:start + block_size],
+                                  np.broadcast_to(touched_rows, fresh_sims.shape)])
+            select(cand_idx, np.hstack([kept_sims, fresh_sims]), rows)
+
+        if verify:
+            sample = np.sort(np.random.default_rng(0).choice(n, size=min(verify, n), replace=False))
+            exact = Xn[sample] @ Xn.T
+            exact[np.arange(len(sample)), sample] = -np.inf
+            exact = -np.sort(-exact, axis=1)[:, :k]
+            if not np.allclose(similarities[sample], exact, atol=1e-5):
+                warnings.warn("Incremental neighbor table differs from a full rebuild on sampled "
+                              "occupations; rebuilding in full.", RuntimeWarning)
+                return cls.from_matrices(matrices, scale=scale, domains=domains, k=k, block_size=block_size)
+        return cls(matrices.occupations, indices, similarities)
+
+    def neighbors(self, code: str, k: Optional[int] = None) -> pd.DataFrame:
+        """Nearest occupations to one O*NET-SOC code"""
+        row = self.occupations.get_indexer([str(code).strip()])[0]
+        if row < 0:
+            return pd.DataFrame(columns=["O*NET Code", "Similarity"])
+        k = self.k if k is None else min(k, self.k)
+        return pd.DataFrame({
+            "O*NET Code": self.occupations[self.indices[row, :k]],
+            "Similarity": self.similarities[row, :k],
+        })
+
+    def lower_risk_transitions(self, risk_df: pd.DataFrame, min_risk: float = 0.67, k: int = 5) -> pd.DataFrame:
+        """
+        For every occupation with "Automation Risk Score" >= min_risk, its k most
+        similar occupations that have a lower risk score (vectorized over all sources).
+
+        risk_df needs "O*NET Code", "Occupation" and "Automation Risk Score".
+        """
+        columns = ["O*NET Code", "Occupation", "Automation Risk Score", "Rank",
+                   "Transition Code", "Transition Occupation", "Transition Risk Score", "Similarity"]
+        risk = risk_df.drop_duplicates("O*NET Code").set_index("O*NET Code")
+        risk_by_row = risk["Automation Risk Score"].reindex(self.occupations).to_numpy(dtype=float)
+        title_by_row = risk["Occupation"].reindex(self.occupations).to_numpy()
+
+        sources = np.flatnonzero(risk_by_row >= min_risk)
+        if sources.size == 0 or self.k == 0:
+            return pd.DataFrame(columns=columns)
+
+        cand = self.indices[sources]  # (s, k_table)
+        cand_risk = risk_by_row[cand]
+        lower = cand_risk < risk_by_row[sources][:, np.newaxis]  # NaN risk never qualifies
+        rank = np.cumsum(lower, axis=1)
+        keep = lower & (rank <= k)
+
+        src_rows = np.repeat(sources, keep.sum(axis=1))
+        dst_rows = cand[keep]
+        return pd.DataFrame({
+            "O*NET Code": self.occupations[src_rows],
+            "Occupation": title_by_row[src_rows],
+            "Automation Risk Score": risk_by_row[src_rows],
+            "Rank": rank[keep],
+            "Transition Code": self.occupations[dst_rows],
+            "Transition Occupation": title_by_row[dst_rows],
+            "Transition Risk Score": risk_by_row[dst_rows],
+            "Similarity": self.similarities[sources][keep],
+        }, columns=columns)
+
+
+# ============================================================
+# Retraining Paths (sparse k-NN graph + heap-based search)
+# ============================================================
+
+class TransitionGraph:
+    """
+    Sparse k-nearest-neighbor graph over occupations in CSR form
+    (indptr / indices / distances arrays), with distance = 1 - cosine similarity.
+
+    Edge costs for path search combine that skill distance with the automation
+    risk of the destination occupation, so routes prefer both similar and safer jobs:
+        cost(u -> v) = distance(u, v) + risk_weight * risk(v)
+    """
+
+    def __init__(self, occupations: pd.Index, indptr: np.ndarray, indices: np.ndarray, distances: np.ndarray):
+        self.occupations = occupations
+        self.indptr = indptr
+        self.indices = indices
+        self.distances = distances
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def __repr__(self):
+        return f"TransitionGraph(occupations={len(self.occupations)}, edges={self.n_edges})"
+
+    @classmethod
+    def from_similarity(cls, similarity: OccupationSimilarity, symmetric: bool = True):
+        """Build the CSR graph from a top-k neighbor table (optionally with reverse edges)"""
+        n, k = similarity.indices.shape
+        src = np.repeat(np.arange(n, dtype=np.int64), k)
+        dst = similarity.indices.reshape(-1).astype(np.int64)
+        dist = (1.0 - similarity.similarities.reshape(-1)).clip(0.0, 2.0).astype(np.float32)
+        if symmetric:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            dist = np.concatenate([dist, dist])
+
+        # Deduplicate (u, v) pairs and sort edges by source
+        keys, first = np.unique(src * n + dst, return_index=True)
+        src, dst, dist = keys // n, keys % n, dist[first]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))]).astype(np.int64)
+        return cls(similarity.occupations, indptr, dst.astype(np.int32), dist)
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+    def save(self, path: str) -> None:
+        np.savez(path, occupations=np.asarray(self.occupations, dtype=str),
+                 indptr=self.indptr, indices=self.indices, distances=self.distances)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as f:
+            return cls(pd.Index(f["occupations"], name="O*NET-SOC Code"),
+                       f["indptr"], f["indices"], f["distances"])
+
+    # --------------------------------------------------------
+    # Shortest retraining route (Dijkstra)
+    # --------------------------------------------------------
+    def shortest_path(self, source: str, target: str, risk: np.ndarray, risk_weight: float = 1.0):
+        """
+        Cheapest route from source to target occupation code.
+
+        Args:
+            source, target: O*NET-SOC codes
+            risk: Automation risk per graph row (NaN treated as 0.5)
+            risk_weight: Weight of destination risk in each edge cost
+
+        Returns:
+            (list of row positions along the route, total cost); ([], inf) if unreachable
+        """
+        s, t = self.occupations.get_indexer([source, target])
+        if s < 0 or t < 0:
+            return [], np.inf
+        node_risk = np.nan_to_num(np.asarray(risk, dtype=float), nan=0.5)
+
+        best = {s: 0.0}
+        previous = {}
+        heap = [(0.0, s)]
+        indptr, indices, distances = self.indptr, self.indices, self.distances
+        while heap:
+            cost, u = heapq.heappop(heap)
+            if u == t:
+                break
+            if cost > best.get(u, np.inf):
+                continue
+            lo, hi = indptr[u], indptr[u + 1]
+            nbrs = indices[lo:hi]
+            new_costs = cost + distances[lo:hi] + risk_weight * node_risk[nbrs]
+            for v, c in zip(nbrs.tolist(), new_costs.tolist()):
+                if c < best.get(v, np.inf):
+                    best[v] = c
+                    previous[v] = u
+                    heapq.heappush(heap, (c, v))
+
+        if t not in best:
+            return [], np.inf
+        route = [t]
+        while route[-1] != s:
+            route.append(previous[route[-1]])
+        return route[::-1], best[t]
+
+
+# ============================================================
+# Task Content Measures (Work Activities / Work Context)
+# ============================================================
+
+# Element IDs per task-content measure: (Element ID, Scale ID, sign).
+# Composites follow the Acemoglu–Autor O*NET definitions; sign -1 reverses an item.
+TASK_CONTENT_ELEMENTS = {
+    "Non-Routine Analytic": [
+        ("4.A.2.a.4", "IM", 1),   # Analyzing data or information
+        ("4.A.2.b.2", "IM", 1),   # Thinking creatively
+        ("4.A.4.a.1", "IM", 1),   # Interpreting the meaning of information for others
+    ],
+    "Interpersonal": [
+        ("4.A.4.a.4", "IM", 1),   # Establishing and maintaining interpersonal relationships
+        ("4.A.4.b.4", "IM", 1),   # Guiding, directing, and motivating subordinates
+        ("4.A.4.b.5", "IM", 1),   # Coaching and developing others
+    ],
+    "Routine Cognitive": [
+        ("4.C.3.b.7", "CX", 1),   # Importance of repeating same tasks
+        ("4.C.3.b.4", "CX", 1),   # Importance of being exact or accurate
+        ("4.C.3.b.8", "CX", -1),  # Structured versus unstructured work (reverse)
+    ],
+    "Routine Manual": [
+        ("4.C.3.d.3", "CX", 1),   # Pace determined by speed of equipment
+        ("4.A.3.a.3", "IM", 1),   # Controlling machines and processes
+        ("4.C.2.d.1.i", "CX", 1), # Spend time making repetitive motions
+    ],
+}
+
+
+def _zscore_columns(M: np.ndarray) -> np.ndarray:
+    """Column-wise z-scores across occupations, ignoring NaN"""
+    mean = np.nanmean(M, axis=0)
+    std = np.nanstd(M, axis=0)
+    return (M - mean) / np.where(std > 0, std, 1.0)
+
+
+def compute_task_content_measures(tables: List[pd.DataFrame], elements: Dict[str, list] = None) -> Optional[pd.DataFrame]:
+    """
+    Standardized task-content measures per occupation.
+
+    Each long table (Work Activities, Work Context) is filtered to the needed
+    (Element ID, Scale ID) pairs before pivoting, so only a few thousand of the
+    ~100k+ rows are touched. Items are z-scored across occupations, averaged per
+    measure (sign-adjusted), and the composite is z-scored again.
+
+    Returns:
+        DataFrame indexed by O*NET-SOC Code with one column per measure
+        (None if no table has the required columns)
+    """
+    elements = elements or TASK_CONTENT_ELEMENTS
+    required = ["O*NET-SOC Code", "Element ID", "Scale ID", "Data Value"]
+    items = pd.Index(sorted({(e, scale) for spec in elements.values() for e, scale, _ in spec}))
+
+    parts = []
+    for df in tables:
+        if df is None or df.empty or not all(c in df.columns for c in required):
+            continue
+        keys = pd.MultiIndex.from_arrays([df["Element ID"].astype(str), df["Scale ID"].astype(str)])
+        mask = keys.isin(items)
+        if "Category" in df.columns:
+            # category rows (CXP/CTP distributions) are not mean ratings
+            mask &= df["Category"].isna().to_numpy()
+        if mask.any():
+            parts.append(df.loc[mask, required])
+    if not parts:
+        return None
+
+    long = pd.concat(parts, ignore_index=True)
+    occ_codes, occupations = pd.factorize(long["O*NET-SOC Code"].astype(str).str.strip(), sort=True)
+    item_codes = items.get_indexer(pd.MultiIndex.from_arrays(
+        [long["Element ID"].astype(str), long["Scale ID"].astype(str)]
+    ))
+
+    # occupation × item matrix; NaN where an occupation has no rating
+    M = np.full((len(occupations), len(items)), np.nan)
+    M[occ_codes, item_codes] = pd.to_numeric(long["Data Value"], errors="coerce").to_numpy(dtype=float)
+    Z = _zscore_columns(M)
+
+    measures = {}
+    for name, spec in elements.items():
+        cols = items.get_indexer([(e, scale) for e, scale, _ in spec])
+        signs = np.array([sign for _, _, sign in spec], dtype=float)
+        item_z = Z[:, cols] * signs
+        rated = (~np.isnan(item_z)).sum(axis=1)
+        composite = np.where(rated > 0, np.nansum(item_z, axis=1) / np.maximum(rated, 1), np.nan)
+        measures[name] = _zscore_columns(composite[:, None])[:, 0]
+
+    return pd.DataFrame(measures, index=pd.Index(occupations, name="O*NET-SOC Code"))
+
+
+# ============================================================
+# Release Diffs (hashed record keys)
+# ============================================================
+
+RELEASE_VALUE_TOLERANCE = 1e-6
+
+
+def release_records(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Flatten long rating tables into one record frame keyed by a 64-bit hash of
+    (domain, occupation, element, scale, category).
+
+    Args:
+        tables: Domain name -> long table with "O*NET-SOC Code", "Element ID" or
+                "Element Name", "Scale ID", "Data Value" (and optionally "Category")
+
+    Returns:
+        DataFrame with Key (uint64), Domain, O*NET Code, Element, Scale, Value
+    """
+    parts = []
+    for domain, df in tables.items():
+        if df is None or df.empty:
+            continue
+        element_col = "Element ID" if "Element ID" in df.columns else "Element Name"
+        if not all(c in df.columns for c in ["O*NET-SOC Code", element_col, "Scale ID", "Data Value"]):
+            continue
+        parts.append(pd.DataFrame({
+            "Domain": domain,
+            "O*NET Code": df["O*NET-SOC Code"].astype(str).str.strip().to_numpy(),
+            "Element": df[element_col].astype(str).to_numpy(),
+            "Scale": df["Scale ID"].astype(str).to_numpy(),
+            "Category": df["Category"].astype(str).to_numpy() if "Category" in df.columns else "",
+            "Value": pd.to_numeric(df["Data Value"], errors="coerce").to_numpy(dtype=float),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=["Key", "Domain", "O*NET Code", "Element", "Scale", "Value"])
+
+    records = pd.concat(parts, ignore_index=True)
+    key_cols = ["Domain", "O*NET Code", "Element", "Scale", "Category"]
+    records.insert(0, "Key", pd.util.hash_pandas_object(records[key_cols], index=False).to_numpy())
+    return records.drop(columns=["Category"]).drop_duplicates("Key", keep="last", ignore_index=True)
+
+
+def diff_release_records(old: pd.DataFrame, new: pd.DataFrame, tol: float = RELEASE_VALUE_TOLERANCE) -> pd.DataFrame:
+    """
+    Changed, added and removed records between two releases in one sorted-key join.
+
+    Returns:
+        DataFrame with Status ("changed" / "added" / "removed"), Domain, O*NET Code,
+        Element, Scale, Old Value, New Value (unchanged records are omitted)
+    """
+    old = old.sort_values("Key", ignore_index=True)
+    old_keys = old["Key"].to_numpy()
+    new_keys = new["Key"].to_numpy()
+    new_values = new["Value"].to_numpy(dtype=float)
+
+    if len(old_keys):
+        pos = np.minimum(np.searchsorted(old_keys, new_keys), len(old_keys) - 1)
+        matched = old_keys[pos] == new_keys
+        old_values = np.where(matched, old["Value"].to_numpy(dtype=float)[pos], np.nan)
+    else:
+        pos = np.zeros(len(new_keys), dtype=int)
+        matched = np.zeros(len(new_keys), dtype=bool)
+        old_values = np.full(len(new_keys), np.nan)
+    changed = matched & ~(np.isclose(old_values, new_values, atol=tol, rtol=0) |
+                          (np.isnan(old_values) & np.isnan(new_values)))
+
+    old_seen = np.zeros(len(old_keys), dtype=bool)
+    old_seen[pos[matched]] = True
+
+    label_cols = ["Domain", "O*NET Code", "Element", "Scale"]
+    changed_df = new.loc[changed, label_cols].assign(Status="changed", **{"Old Value": old_values[changed],
+                                                                          "New Value": new_values[changed]})
+    added_df = new.loc[~matched, label_cols].assign(Status="added", **{"Old Value": np.nan,
+                                                                       "New Value": new_values[~matched]})
+    removed_df = old.loc[~old_seen, label_cols].assign(Status="removed", **{"Old Value": old["Value"].to_numpy()[~old_seen],
+                                                                            "New Value": np.nan})
+    diff = pd.concat([changed_df, added_df, removed_df], ignore_index=True)
+    return diff[["Status"] + label_cols + ["Old Value", "New Value"]]
+
+
+# ============================================================
+# Occupation Clusters (mini-batch k-means)
+# ============================================================
+
+def _assign_clusters(X: np.ndarray, centroids: np.ndarray, block_size: int = 2048):
+    """Nearest centroid and squared distance per row, block by block (bounded memory)"""
+    labels = np.empty(X.shape[0], dtype=np.int32)
+    distances = np.empty(X.shape[0], dtype=np.float32)
+    c_sq = (centroids ** 2).sum(axis=1)
+    for start in range(0, X.shape[0], block_size):
+        block = X[start:start + block_size]
+        d = (block ** 2).sum(axis=1, keepdims=True) - 2.0 * block @ centroids.T + c_sq
+        labels[start:start + block_size] = d.argmin(axis=1)
+        distances[start:start + block_size] = np.maximum(d.min(axis=1), 0.0)
+    return labels, distances
+
+
+def mini_batch_kmeans(X: np.ndarray, n_clusters: int, batch_size: int = 256, max_iter: int = 100,
+                      tol: float = 1e-4, seed: int = 0):
+    """
+    Mini-batch k-means (Sculley, 2010) with k-means++ seeding.
+
+    Each iteration draws batch_size rows, assigns them to their nearest centroid
+    and moves those centroids with a per-centroid learning rate 1 / count, so
+    memory is bounded by the batch and assignment block sizes. Fully determined
+    by seed.
+
+    Returns:
+        (labels, centroids, inertia) for the full matrix
+    """
+    X = np.asarray(X, dtype=np.float32)
+    n = X.shape[0]
+    n_clusters = max(1, min(n_clusters, n))
+    rng = np.random.default_rng(seed)
+
+    # k-means++ seeding on a bounded sample
+    sample = X[rng.choice(n, size=min(n, max(10 * n_clusters, batch_size)), replace=False)]
+    centroids = np.empty((n_clusters, X.shape[1]), dtype=np.float32)
+    centroids[0] = sample[rng.integers(len(sample))]
+    closest = ((sample - centroids[0]) ** 2).sum(axis=1)
+    for c in range(1, n_clusters):
+        total = closest.sum()
+        pick = rng.choice(len(sample), p=closest / total) if total > 0 else rng.integers(len(sample))
+        centroids[c] = sample[pick]
+        closest = np.minimum(closest, ((sample - centroids[c]) ** 2).sum(axis=1))
+
+    counts = np.zeros(n_clusters, dtype=np.float64)
+    for _ in range(max_iter):
+        batch = X[rng.choice(n, size=min(batch_size, n), replace=False)]
+        labels, _ = _assign_clusters(batch, centroids)
+        previous = centroids.copy()
+        for c in np.unique(labels):
+            members = batch[labels == c]
+            counts[c] += len(members)
+            rate = len(members) / counts[c]
+            centroids[c] += rate * (members.mean(axis=0) - centroids[c])
+        if np.abs(centroids - previous).max() < tol:
+            break
+
+    labels, distances = _assign_clusters(X, centroids)
+    return labels, centroids, float(distances.sum())
+
+
+class OccupationClusters:
+    """Occupation cluster assignments and centroids over element vectors"""
+
+    def __init__(self, occupations: pd.Index, elements: pd.MultiIndex, labels: np.ndarray,
+                 centroids: np.ndarray, inertia: float):
+        self.occupations = occupations
+        self.elements = elements
+        self.labels = labels
+        self.centroids = centroids
+        self.inertia = inertia
+
+    @property
+    def n_clusters(self) -> int:
+        return self.centroids.shape[0]
+
+    def __repr__(self):
+        return f"OccupationClusters(occupations={len(self.occupations)}, clusters={self.n_clusters})"
+
+    @classmethod
+    def from_matrices(cls, matrices: OccupationElementMatrices, n_clusters: int = 8, scale: str = "IM",
+                      domains=("Skills", "Knowledge", "Abilities"), seed: int = 0, **kwargs):
+        """Cluster occupations on their (0–1 scaled) skill, knowledge and ability vectors"""
+        mask = matrices.domain_mask(list(domains)) if domains else np.ones(len(matrices.elements), dtype=bool)
+        X = matrices.matrix(scale)[:, mask]
+        labels, centroids, inertia = mini_batch_kmeans(X, n_clusters, seed=seed, **kwargs)
+        return cls(matrices.occupations, matrices.elements[mask], labels, centroids, inertia)
+
+    def assignments(self) -> pd.DataFrame:
+        return pd.DataFrame({"O*NET Code": self.occupations, "Cluster": self.labels})
+
+    def top_elements(self, n: int = 5) -> pd.DataFrame:
+        """Highest-weighted elements of every centroid"""
+        top = np.argsort(-self.centroids, axis=1)[:, :n]
+        names = self.elements.get_level_values("Element").to_numpy()
+        return pd.DataFrame({
+            "Cluster": np.arange(self.n_clusters),
+            "Size": np.bincount(self.labels, minlength=self.n_clusters),
+            "Top Elements": [", ".join(names[row]) for row in top],
+        })
+
+
+# ============================================================
+# Occupation Map (randomized PCA)
+# ============================================================
+
+def randomized_pca(X: np.ndarray, n_components: int = 2, oversample: int = 10, n_iter: int = 4, seed: int = 0):
+    """
+    Randomized PCA (Halko, Martinsson & Tropp, 2011).
+
+    Projects the centered matrix onto a random (n_components + oversample)-dim
+    subspace, refines it with a few power iterations (QR-stabilized), and takes
+    the SVD of the small projected matrix — a handful of matrix products instead
+    of a full SVD.
+
+    Returns:
+        (coordinates (n, n_components), explained variance ratio (n_components,))
+    """
+    X = np.asarray(X, dtype=np.float64)
+    Xc = X - X.mean(axis=0)
+    rank = min(n_components + oversample, *Xc.shape)
+    rng = np.random.default_rng(seed)
+
+    Q, _ = np.linalg.qr(Xc @ rng.standard_normal((Xc.shape[1], rank)))
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(Xc.T @ Q)
+        Q, _ = np.linalg.qr(Xc @ Q)
+
+    U_small, S, _ = np.linalg.svd(Q.T @ Xc, full_matrices=False)
+    coordinates = (Q @ U_small[:, :n_components]) * S[:n_components]
+    total_variance = (Xc ** 2).sum()
+    explained = S[:n_components] ** 2 / total_variance if total_variance > 0 else np.zeros(n_components)
+    return coordinates.astype(np.float32), explained
+
+
+class OccupationMap:
+    """2-D embedding of occupations over their element vectors"""
+
+    def __init__(self, occupations: pd.Index, coordinates: np.ndarray, explained: np.ndarray):
+        self.occupations = occupations
+        self.coordinates = coordinates
+        self.explained = explained
+
+    def __repr__(self):
+        return f"OccupationMap(occupations={len(self.occupations)}, explained={self.explained.round(3).tolist()})"
+
+    @classmethod
+    def from_matrices(cls, matrices: OccupationElementMatrices, scale: str = "IM",
+                      domains=("Skills", "Knowledge", "Abilities"), seed: int = 0):
+        """Embed the (0–1 scaled) skill, knowledge and ability vectors with randomized PCA"""
+        mask = matrices.domain_mask(list(domains)) if domains else np.ones(len(matrices.elements), dtype=bool)
+        coordinates, explained = randomized_pca(matrices.matrix(scale)[:, mask], n_components=2, seed=seed)
+        return cls(matrices.occupations, coordinates, explained)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "O*NET Code": self.occupations,
+            "PC1": self.coordinates[:, 0],
+            "PC2": self.coordinates[:, 1],
+        })
+
+
+# ============================================================
+# SOC → ISCO-08 Bridge (country exposure)
+# ============================================================
+
+class SocIscoCrosswalk:
+    """
+    Many-to-many SOC ↔ ISCO-08 crosswalk (e.g. the BLS ISCO-08 / 2010 SOC table).
+
+    SOC codes are kept as 6-digit integers (see parse_soc_codes) so O*NET-SOC
+    codes ("11-1011.00") match crosswalk SOC codes ("11-1011") directly.
+    """
+
+    def __init__(self, soc: np.ndarray, isco: np.ndarray):
+        self.soc = soc
+        self.isco = isco
+
+    def __repr__(self):
+        return f"SocIscoCrosswalk(pairs={len(self.soc)}, isco_groups={len(np.unique(self.isco))})"
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, soc_col: Optional[str] = None, isco_col: Optional[str] = None):
+        """Build from a crosswalk table (SOC / ISCO code columns are detected by name if not given)"""
+        lower = {c: str(c).lower() for c in df.columns}
+        soc_col = soc_col or next((c for c, l in lower.items() if "soc" in l and "code" in l), None)
+        isco_col = isco_col or next((c for c, l in lower.items() if "isco" in l and "code" in l), None)
+        if soc_col is None or isco_col is None:
+            return None
+        # unit groups are 4 digits; spreadsheets may drop the leading zero of armed-forces codes
+        isco = df[isco_col].astype(str).str.extract(r"(\d{1,4})", expand=False).str.zfill(4)
+        soc = parse_soc_codes(df[soc_col])
+        valid = (soc >= 0) & isco.notna().to_numpy()
+        return cls(soc[valid], isco[valid].to_numpy(dtype=str))
+
+    def mapping_matrix(self, occupation_codes, isco_groups: pd.Index):
+        """
+        Sparse (ISCO groups × occupations) averaging matrix: row g holds 1 / n_g for
+        each of the n_g occupations mapped to group g. Crosswalk ISCO codes are
+        truncated to the digit level of isco_groups (e.g. 1-digit major groups).
+        """
+        digits = len(isco_groups[0]) if len(isco_groups) else 4
+        occupations = pd.DataFrame({"soc": parse_soc_codes(occupation_codes)})
+        occupations["occ"] = np.arange(len(occupations))
+        pairs = pd.DataFrame({
+            "soc": self.soc,
+            "group": isco_groups.get_indexer(pd.Index([code[:digits] for code in self.isco])),
+        })
+        pairs = pairs[pairs["group"] >= 0].merge(occupations, on="soc").drop_duplicates(["group", "occ"])
+
+        M = sparse.csr_matrix(
+            (np.ones(len(pairs)), (pairs["group"].to_numpy(), pairs["occ"].to_numpy())),
+            shape=(len(isco_groups), len(occupations)),
+        )
+        counts = np.asarray(M.sum(axis=1)).ravel()
+        return sparse.diags(np.divide(1.0, counts, out=np.zeros_like(counts), where=counts > 0)) @ M
+
+
+def country_exposure(employment: pd.DataFrame, crosswalk: SocIscoCrosswalk, risk: pd.DataFrame,
+                     metrics: List[str]) -> pd.DataFrame:
+    """
+    Employment-weighted exposure per (Area, Year), all metrics and country-years
+    in one batched sparse product:
+
+        exposure = (country-years × ISCO employment) · (ISCO × metrics) / covered employment
+
+    Args:
+        employment: long frame with Area, Year, ISCO (code string), Employment
+        crosswalk: SOC ↔ ISCO crosswalk
+        risk: per-occupation frame with "O*NET Code" and the metric columns
+        metrics: metric columns to aggregate
+
+    Returns:
+        DataFrame with Area, Year, one column per metric and Coverage
+        (share of employment in ISCO groups with mapped occupations)
+    """
+    isco_groups = pd.Index(np.sort(employment["ISCO"].unique()))
+    C = crosswalk.mapping_matrix(risk["O*NET Code"], isco_groups)
+    isco_metrics = C @ risk[metrics].to_numpy(dtype=float)           # (ISCO × metrics)
+    covered = np.asarray(C.sum(axis=1)).ravel() > 0
+
+    row_codes, country_years = pd.factorize(pd.MultiIndex.from_arrays([employment["Area"], employment["Year"]]))
+    E = sparse.csr_matrix(
+        (employment["Employment"].to_numpy(dtype=float), (row_codes, isco_groups.get_indexer(employment["ISCO"]))),
+        shape=(len(country_years), len(isco_groups)),
+    )                                                                # (country-years × ISCO)
+    total = np.asarray(E.sum(axis=1)).ravel()
+    covered_total = E @ covered.astype(float)
+    exposure = (E @ isco_metrics) / np.where(covered_total > 0, covered_total, np.nan)[:, None]
+
+    result = pd.DataFrame(exposure, columns=metrics)
+    result.insert(0, "Year", country_years.get_level_values(1))
+    result.insert(0, "Area", country_years.get_level_values(0))
+    result["Coverage"] = np.divide(covered_total, total, out=np.zeros_like(total), where=total > 0)
+    return result.sort_values(["Area", "Year"], ignore_index=True)
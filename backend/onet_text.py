@@ -0,0 +1,413 @@
+# ============================================================
+# O*NET Task Text Models
+# TF-IDF search over Task Statements and
+# phrase-based task content shares, Task Ratings profiles,
+# occupation title search
+# ============================================================
+
+import re
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from typing import Dict, Iterable, List, Optional
+
+# Task content phrase dictionary (matched as whole words, case-insensitive)
+TASK_CONTENT_PHRASES: Dict[str, List[str]] = {
+    "Routine": [
+        "record", "records", "recording", "log", "enter data", "data entry", "file", "filing",
+        "sort", "sorts", "sorting", "count", "counts", "tally", "verify", "verifies", "check", "checks",
+        "inspect", "inspects", "monitor", "monitors", "compile", "compiles", "calculate", "calculates",
+        "tabulate", "process", "processes", "processing", "schedule", "schedules", "copy", "copies",
+        "transcribe", "type", "types", "post", "posts", "maintain records", "keep records",
+        "prepare reports", "fill out", "complete forms", "measure", "measures", "weigh", "weighs",
+        "label", "labels", "stock", "stocks", "inventory", "collate", "classify", "code",
+    ],
+    "Manual": [
+        "assemble", "assembles", "operate", "operates", "operating", "load", "loads", "unload",
+        "unloads", "lift", "lifts", "move", "moves", "carry", "carries", "install", "installs",
+        "repair", "repairs", "clean", "cleans", "cut", "cuts", "drive", "drives", "pack", "packs",
+        "package", "packages", "weld", "welds", "drill", "drills", "mix", "mixes", "pour", "pours",
+        "tend", "tends", "feed", "feeds", "adjust", "adjusts", "position", "positions", "mount",
+        "paint", "paints", "sew", "sews", "machine", "machines", "equipment", "tools", "hand tools",
+        "forklift", "conveyor", "dig", "harvest", "plant", "stack", "stacks",
+    ],
+    "Interpersonal": [
+        "advise", "advises", "counsel", "counsels", "negotiate", "negotiates", "supervise",
+        "supervises", "train", "trains", "teach", "teaches", "instruct", "instructs", "coordinate",
+        "coordinates", "consult", "consults", "collaborate", "collaborates", "confer", "confers",
+        "interview", "interviews", "persuade", "mentor", "motivate", "direct", "directs", "manage",
+        "manages", "lead", "leads", "present", "presents", "communicate", "communicates",
+        "customers", "clients", "patients", "students", "staff", "team", "public", "resolve conflicts",
+        "explain", "explains", "discuss", "discusses", "assist customers", "care for",
+    ],
+}
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex alternation for a set of literal terms, factored as a prefix trie"""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" not in node:
+            return body
+        return body + "?" if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")?"
+
+    return emit(trie)
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """Positions of the k largest scores (sorted, descending) and their values"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.array([], dtype=int), np.array([], dtype=float)
+    part = np.argpartition(-scores, k - 1)[:k]
+    order = np.argsort(-scores[part])
+    return part[order], scores[part[order]]
+
+
+class TaskTextIndex:
+    """
+    Sparse TF-IDF index over O*NET Task Statements.
+
+    - task_matrix: tasks × terms (L2-normalized TF-IDF)
+    - occupation_matrix: occupations × terms, the sum of an occupation's task
+      vectors, L2-normalized (an occupation × task indicator matrix product)
+
+    Queries and task-overlap similarity are sparse matrix products.
+    """
+
+    def __init__(self, vectorizer: TfidfVectorizer, task_matrix, occupation_matrix,
+                 occupations: pd.Index, task_codes: np.ndarray, task_texts: np.ndarray):
+        self.vectorizer = vectorizer
+        self.task_matrix = task_matrix
+        self.occupation_matrix = occupation_matrix
+        self.occupations = occupations
+        self.task_codes = task_codes
+        self.task_texts = task_texts
+
+    def __repr__(self):
+        return (f"TaskTextIndex(tasks={self.task_matrix.shape[0]}, occupations={len(self.occupations)}, "
+                f"terms={self.task_matrix.shape[1]})")
+
+    @classmethod
+    def from_tasks(cls, task_df: pd.DataFrame, code_col: str = "O*NET-SOC Code", task_col: str = "Task"):
+        """Fit the index on a Task Statements table"""
+        tasks = task_df[[code_col, task_col]].dropna()
+        texts = tasks[task_col].astype(str).to_numpy()
+        codes = tasks[code_col].astype(str).str.strip()
+
+        vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, ngram_range=(1, 2), min_df=2, dtype=np.float32)
+        task_matrix = vectorizer.fit_transform(texts)
+
+        # occupation × task indicator, then aggregate task vectors per occupation
+        occ_codes, occupations = pd.factorize(codes, sort=True)
+        membership = sparse.csr_matrix(
+            (np.ones(len(occ_codes), dtype=np.float32), (occ_codes, np.arange(len(occ_codes)))),
+            shape=(len(occupations), len(occ_codes)),
+        )
+        occupation_matrix = normalize(membership @ task_matrix)
+        return cls(vectorizer, task_matrix.tocsr(), occupation_matrix.tocsr(),
+                   pd.Index(occupations, name="O*NET-SOC Code"), codes.to_numpy(), texts)
+
+    def search(self, query: str, k: int = 10) -> pd.DataFrame:
+        """Occupations best matching a free-text query (cosine over TF-IDF)"""
+        q = self.vectorizer.transform([query])
+        scores = (self.occupation_matrix @ q.T).toarray().ravel()
+        rows, values = _top_k(scores, k)
+        keep = values > 0
+        return pd.DataFrame({"O*NET Code": self.occupations[rows[keep]], "Match Score": values[keep]})
+
+    def search_tasks(self, query: str, k: int = 10) -> pd.DataFrame:
+        """Individual task statements best matching a free-text query"""
+        q = self.vectorizer.transform([query])
+        scores = (self.task_matrix @ q.T).toarray().ravel()
+        rows, values = _top_k(scores, k)
+        keep = values > 0
+        return pd.DataFrame({
+            "O*NET Code": self.task_codes[rows[keep]],
+            "Task": self.task_texts[rows[keep]],
+            "Match Score": values[keep],
+        })
+
+    def task_overlap(self, code: str, k: int = 10) -> pd.DataFrame:
+        """Occupations whose task content overlaps most with one occupation"""
+        row = self.occupations.get_indexer([str(code).strip()])[0]
+        if row < 0:
+            return pd.DataFrame(columns=["O*NET Code", "Task Overlap"])
+        scores = (self.occupation_matrix @ self.occupation_matrix[row].T).toarray().ravel()
+        scores[row] = -np.inf
+        rows, values = _top_k(scores, k)
+        keep = values > 0
+        return pd.DataFrame({"O*NET Code": self.occupations[rows[keep]], "Task Overlap": values[keep]})
+
+
+class TaskPhraseMatcher:
+    """
+    Single compiled matcher for a dictionary of task content phrases.
+
+    All phrases of all categories are compiled into one alternation with one named
+    group per category, so every task statement is scanned once regardless of
+    dictionary size. Each category's phrases are factored into a prefix trie, so a
+    position that starts no phrase is rejected after one character test; optional
+    suffixes are greedy, so longer phrases are tried first.
+    """
+
+    def __init__(self, phrases: Dict[str, List[str]] = None):
+        self.phrases = phrases or TASK_CONTENT_PHRASES
+        self.categories = list(self.phrases)
+        groups = []
+        for i, category in enumerate(self.categories):
+            terms = {p.lower() for p in self.phrases[category]}
+            groups.append(f"(?P<c{i}>" + _trie_pattern(terms) + ")")
+        self.pattern = re.compile(r"\b(?:" + "|".join(groups) + r")\b", re.IGNORECASE)
+
+    def match_flags(self, texts: pd.Series) -> pd.DataFrame:
+        """Boolean task × category frame: does the task mention any phrase of the category"""
+        flags = np.zeros((len(texts), len(self.categories)), dtype=bool)
+        column = {f"c{j}": j for j in range(len(self.categories))}
+        finditer = self.pattern.finditer
+        for i, text in enumerate(texts.astype(str)):
+            for m in finditer(text):
+                flags[i, column[m.lastgroup]] = True
+        return pd.DataFrame(flags, columns=self.categories)
+
+    def occupation_shares(self, task_df: pd.DataFrame, code_col: str = "O*NET-SOC Code",
+                          task_col: str = "Task", weights: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Per-occupation share of task statements in each category.
+
+        weights (one per row of task_df, e.g. task importance) turn the shares into
+        weighted shares; NaN weights fall back to the occupation's mean weight.
+        Returns a frame indexed by occupation code with '<Category> Share' and 'Task Count'
+        columns, plus 'Rated Task Count' when weights are given.
+        """
+        valid = task_df[code_col].notna().to_numpy() & task_df[task_col].notna().to_numpy()
+        tasks = task_df.loc[valid, [code_col, task_col]]
+        occ_codes, occupations = pd.factorize(tasks[code_col].astype(str).str.strip(), sort=True)
+        flags = self.match_flags(tasks[task_col]).to_numpy(dtype=float)
+
+        n_occ = len(occupations)
+        counts = np.bincount(occ_codes, minlength=n_occ).astype(float)
+        rated_count = None
+        if weights is None:
+            w = np.ones(len(occ_codes))
+        else:
+            w = np.asarray(weights, dtype=float)[valid]
+            rated = ~np.isnan(w)
+            rated_sum = np.bincount(occ_codes, weights=np.where(rated, w, 0.0), minlength=n_occ)
+            rated_count = np.bincount(occ_codes, weights=rated.astype(float), minlength=n_occ)
+            occ_mean = np.where(rated_count > 0, rated_sum / np.maximum(rated_count, 1), 1.0)
+            w = np.where(rated, w, occ_mean[occ_codes])
+        totals = np.bincount(occ_codes, weights=w, minlength=n_occ)
+        totals = np.where(totals > 0, totals, 1.0)
+
+        shares = {
+            f"{category} Share": np.bincount(occ_codes, weights=w * flags[:, j], minlength=n_occ) / totals
+            for j, category in enumerate(self.categories)
+        }
+        shares["Task Count"] = counts.astype(int)
+        if rated_count is not None:
+            shares["Rated Task Count"] = rated_count.astype(int)
+        return pd.DataFrame(shares, index=pd.Index(occupations, name="O*NET-SOC Code"))
+
+
+class TaskRatingProfiles:
+    """
+    Compact per-occupation task rating profiles from O*NET Task Ratings.
+
+    Only mean importance (IM, 1–5) and relevance (RT, 0–100) ratings are kept;
+    frequency category distributions (FT) are dropped while streaming. Pairs are
+    stored CSR-style: tasks of occupation i are task_ids[indptr[i]:indptr[i + 1]],
+    sorted by Task ID, with parallel float32 importance / relevance arrays.
+    """
+
+    SCALES = ("IM", "RT")
+
+    def __init__(self, occupations: pd.Index, indptr: np.ndarray, task_ids: np.ndarray,
+                 importance: np.ndarray, relevance: np.ndarray):
+        self.occupations = occupations
+        self.indptr = indptr
+        self.task_ids = task_ids
+        self.importance = importance
+        self.relevance = relevance
+        self._occ_rows = np.repeat(np.arange(len(occupations)), np.diff(indptr))
+
+    def __repr__(self):
+        return f"TaskRatingProfiles(occupations={len(self.occupations)}, tasks={len(self.task_ids)})"
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]):
+        """
+        Stream raw Task Ratings chunks once into compact arrays.
+
+        Each chunk needs "O*NET-SOC Code", "Task ID", "Scale ID" and "Data Value"
+        (and optionally "Category"); only IM / RT mean ratings are retained.
+        """
+        codes, task_ids, is_relevance, values = [], [], [], []
+        for chunk in chunks:
+            scale = chunk["Scale ID"].astype(str).to_numpy()
+            keep = np.isin(scale, cls.SCALES)
+            if "Category" in chunk.columns:
+                keep &= chunk["Category"].isna().to_numpy()
+            if not keep.any():
+                continue
+            codes.append(chunk["O*NET-SOC Code"].to_numpy()[keep].astype(str))
+            task_ids.append(pd.to_numeric(chunk["Task ID"], errors="coerce").to_numpy()[keep])
+            is_relevance.append(scale[keep] == "RT")
+            values.append(pd.to_numeric(chunk["Data Value"], errors="coerce").to_numpy(dtype=np.float32)[keep])
+        if not codes:
+            return None
+
+        task_id = np.concatenate(task_ids)
+        has_id = ~np.isnan(task_id)
+        code = np.char.strip(np.concatenate(codes)[has_id])
+        task_id = task_id[has_id].astype(np.int64)
+        is_rt = np.concatenate(is_relevance)[has_id]
+        value = np.concatenate(values)[has_id]
+
+        # one (occupation, task) key per pair, grouped and sorted
+        occ_codes, occupations = pd.factorize(code, sort=True)
+        span = int(task_id.max()) + 1
+        keys = occ_codes.astype(np.int64) * span + task_id
+        unique_keys, pair = np.unique(keys, return_inverse=True)
+
+        importance = np.full(len(unique_keys), np.nan, dtype=np.float32)
+        relevance = np.full(len(unique_keys), np.nan, dtype=np.float32)
+        importance[pair[~is_rt]] = value[~is_rt]
+        relevance[pair[is_rt]] = value[is_rt]
+
+        pair_occ = unique_keys // span
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(pair_occ, minlength=len(occupations)))])
+        pair_task = (unique_keys % span).astype(np.int32)
+        return cls(pd.Index(occupations, name="O*NET-SOC Code"), indptr, pair_task, importance, relevance)
+
+    def weights(self) -> np.ndarray:
+        """
+        Importance weight per (occupation, task) pair: importance rescaled to 0–1,
+        times relevance share (missing relevance counts as fully relevant)
+        """
+        importance = np.clip((self.importance - 1.0) / 4.0, 0.0, 1.0)
+        relevance = np.where(np.isnan(self.relevance), 1.0, self.relevance / 100.0)
+        return (importance * relevance).astype(np.float32)
+
+    def lookup(self, codes, task_ids) -> np.ndarray:
+        """Weights for arbitrary (O*NET-SOC Code, Task ID) pairs (NaN where unrated)"""
+        rows = self.occupations.get_indexer(pd.Index(codes).astype(str).str.strip())
+        tasks = pd.to_numeric(pd.Series(task_ids), errors="coerce").to_numpy()
+        result = np.full(len(rows), np.nan)
+        known = (rows >= 0) & ~np.isnan(tasks)
+        if not known.any():
+            return result
+
+        # pair keys are sorted by (occupation row, task id)
+        span = int(max(self.task_ids.max(initial=0), np.nanmax(tasks[known]))) + 1
+        pair_keys = self._occ_rows.astype(np.int64) * span + self.task_ids
+        query = rows[known].astype(np.int64) * span + tasks[known].astype(np.int64)
+        pos = np.clip(np.searchsorted(pair_keys, query), 0, len(pair_keys) - 1)
+        found = pair_keys[pos] == query
+        values = np.full(len(query), np.nan)
+        values[found] = self.weights()[pos[found]]
+        result[known] = values
+        return result
+
+    def profile(self, code: str) -> pd.DataFrame:
+        """Rated tasks of one occupation, most important first"""
+        row = self.occupations.get_indexer([str(code).strip()])[0]
+        if row < 0:
+            return pd.DataFrame(columns=["Task ID", "Importance", "Relevance", "Weight"])
+        sl = slice(self.indptr[row], self.indptr[row + 1])
+        profile = pd.DataFrame({
+            "Task ID": self.task_ids[sl],
+            "Importance": self.importance[sl],
+            "Relevance": self.relevance[sl],
+            "Weight": self.weights()[sl],
+        })
+        return profile.sort_values("Weight", ascending=False, ignore_index=True)
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+
+
+class OccupationSearchIndex:
+    """
+    Prebuilt lookup structures over a risk table.
+
+    - Token index: sorted unique title/code tokens with CSR row lists, so a
+      prefix query is a binary-search slice of the token array.
+    - Sorted indexes: row order of each numeric column, so a range filter is a
+      binary-search slice and a sort is a masked walk of a presorted order.
+    """
+
+    def __init__(self, frame: pd.DataFrame, title_col: str = "Occupation", code_col: str = "O*NET Code",
+                 sort_cols=("Automation Risk Score", "Routine Intensity", "Cognitive Complexity")):
+        self.frame = frame.reset_index(drop=True)
+        n = len(self.frame)
+
+        titles = self.frame[title_col].astype(str).str.lower().to_numpy()
+        codes = self.frame[code_col].astype(str).str.lower().to_numpy()
+        token_rows = {}
+        for row, (title, code) in enumerate(zip(titles, codes)):
+            for token in set(_TOKEN_PATTERN.findall(title)) | {code}:
+                token_rows.setdefault(token, []).append(row)
+        self.tokens = np.array(sorted(token_rows), dtype=object)
+        lengths = np.array([len(token_rows[t]) for t in self.tokens], dtype=np.int64)
+        self.token_ptr = np.concatenate([[0], np.cumsum(lengths)])
+        self.token_rows = np.array([r for t in self.tokens for r in token_rows[t]], dtype=np.int32)
+
+        self.orders = {}
+        self.sorted_values = {}
+        for col in sort_cols:
+            if col in self.frame.columns:
+                values = pd.to_numeric(self.frame[col], errors="coerce").to_numpy(dtype=float)
+                order = np.argsort(values, kind="stable")
+                self.orders[col] = order
+                self.sorted_values[col] = values[order]
+        self._n = n
+
+    def __repr__(self):
+        return f"OccupationSearchIndex(rows={self._n}, tokens={len(self.tokens)})"
+
+    def _prefix_rows(self, prefix: str) -> np.ndarray:
+        """Rows with any token starting with prefix (one binary-search slice)"""
+        lo = np.searchsorted(self.tokens, prefix, side="left")
+        hi = np.searchsorted(self.tokens, prefix + "\uffff", side="left")
+        return self.token_rows[self.token_ptr[lo]:self.token_ptr[hi]]
+
+    def search_mask(self, query: str) -> np.ndarray:
+        """Boolean row mask: every query word is a prefix of some title/code token"""
+        mask = np.ones(self._n, dtype=bool)
+        for word in query.lower().split():
+            word_mask = np.zeros(self._n, dtype=bool)
+            word_mask[self._prefix_rows(word)] = True
+            mask &= word_mask
+        return mask
+
+    def range_rows(self, col: str, low: float, high: float) -> np.ndarray:
+        """Rows with low <= col <= high, in ascending order of col (binary-search slice)"""
+        values = self.sorted_values[col]
+        lo = np.searchsorted(values, low, side="left")
+        hi = np.searchsorted(values, high, side="right")
+        return self.orders[col][lo:hi]
+
+    def query(self, text: str = "", risk_range=(0.0, 1.0), sort_by: str = "Automation Risk Score",
+              descending: bool = True, risk_col: str = "Automation Risk Score") -> pd.DataFrame:
+        """Rows matching the search text and risk range, sorted by a presorted column"""
+        mask = np.zeros(self._n, dtype=bool)
+        mask[self.range_rows(risk_col, *risk_range)] = True
+        if text.strip():
+            mask &= self.search_mask(text)
+        order = self.orders.get(sort_by, np.arange(self._n))
+        if descending:
+            order = order[::-1]
+        return self.frame.iloc[order[mask[order]]]
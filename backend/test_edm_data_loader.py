@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+from edm_data_loader import apply_edm_model, calibrate_edm_beta, project_edm_dataset  # noqa: E402
+from edm_model import EDMModel  # noqa: E402
+
+
+def _series(area, employment):
+    years = np.arange(len(employment), dtype=float)
+    return pd.DataFrame({"Area": area, "Employment": employment, "A": 0.5, "TimeYears": years})
+
+
+def test_declining_series_is_not_calibrated():
+    t = np.arange(6, dtype=float)
+    data = pd.concat([
+        _series("Rising", 100.0 * np.exp(0.2 * 0.5 * t)),
+        _series("Falling", 100.0 * np.exp(-0.2 * 0.5 * t)),
+    ], ignore_index=True)
+    calibration = calibrate_edm_beta(data, model=EDMModel(beta=0.3))
+
+    assert calibration.loc["Rising", "calibrated"]
+    assert calibration.loc["Rising", "beta"] == pytest.approx(0.2)
+
+    falling = calibration.loc["Falling"]
+    assert falling["beta_fit"] < 0
+    assert not falling["calibrated"]
+    assert falling["clipped"]
+    assert falling["beta"] == pytest.approx(0.3)
+
+
+def test_projection_labels_calibrated_beta_only_when_calibrated():
+    data = _series("A", [100.0, 110.0, 121.0]).assign(Year=[2020, 2021, 2022])
+    fixed = apply_edm_model(data.copy(), EDMModel(beta=0.3))
+    assert list(project_edm_dataset(fixed, [0, 5]).coords["scenario"]) == [0.3]
+
+    calibrated = apply_edm_model(data.copy(), EDMModel(beta=0.3), beta=pd.Series({"A": 0.2}))
+    assert list(project_edm_dataset(calibrated, [0, 5]).coords["scenario"]) == ["calibrated"]
@@ -0,0 +1,20 @@
+import numpy as np
+
+from onet_model import parse_soc_codes, soc_group_codes, soc_rollups
+
+
+def test_minor_groups_follow_soc_2018_table():
+    soc = parse_soc_codes(["15-1252.00", "15-2031.00", "31-1131.00", "51-5112.00", "51-4121.00"])
+    minor = soc_group_codes(soc, "Minor Group")
+    assert minor.tolist() == [151200, 152000, 311100, 515100, 514000]
+
+
+def test_rollup_parents_broad_15_1250_under_15_1200():
+    rollups = soc_rollups(["15-1252.00", "15-1211.00"], np.array([0.2, 0.4]))
+    parent = rollups.set_index("SOC Code")["Parent"]
+    assert parent["15-1252"] == "15-1250"
+    assert parent["15-1250"] == "15-1200"
+    assert parent["15-1200"] == "15-0000"
+    minor = rollups[rollups["Level"] == "Minor Group"].set_index("SOC Code")
+    assert minor.loc["15-1200", "Occupations"] == 2
+    assert minor.loc["15-1200", "Title"] == "Computer Occupations"